@@ -0,0 +1,215 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from cache import MAX_BYTES, AnalysisCache
+from lexer import LexerError, lexer
+from parser import TokenStream, parse_recovering, parse_statement
+from paths import expand_paths
+from profiling import Stats
+
+# === ANALIZADOR POR LOTES ===
+# Uso: python analizador.py [opciones] archivo|directorio|patrón ...
+# Ejecuta lexer + parser sobre cada archivo en un grupo de procesos y escribe
+# un resultado por archivo en formato JSON lines; al final muestra el total.
+
+# Caché de cada proceso, creada la primera vez que se usa
+_caches = {}
+
+
+def _parse_all(stream, ast):
+    """
+    Añade a `ast` las sentencias de `stream`; si el cursor tiene lista de
+    errores, usa el modo de recuperación del parser.
+    """
+    if stream.errors is not None:
+        ast.extend(parse_recovering(stream))
+    else:
+        while stream:
+            ast.append(parse_statement(stream))
+
+
+def analyze_source(source_code, cache=None, stats=None, recover=False):
+    """
+    Ejecuta lexer y parser sobre un texto.
+    Devuelve (tokens, sentencias, errores), donde cada error es un diccionario
+    con la línea y el mensaje. Si se da una caché, guarda en ella el resultado.
+    Si se da un `stats` (profiling.Stats), mide cada fase y cuenta lo producido.
+    Con `recover`, el análisis no se detiene en el primer error: se reportan
+    todos y las sentencias son las del AST parcial.
+    """
+    errors = [] if recover else None
+    try:
+        if stats is None:
+            tokens = lexer(source_code, errors=errors)
+        else:
+            with stats.phase('lexer'):
+                tokens = lexer(source_code, errors=errors)
+            stats.count_tokens(source_code)
+    except LexerError as error:
+        line = source_code.count('\n', 0, error.position) + 1
+        return 0, 0, [{'line': line, 'message': str(error)}]
+
+    stream = TokenStream(tokens)
+    stream.errors = errors
+    ast = []
+    try:
+        if stats is None:
+            _parse_all(stream, ast)
+        else:
+            with stats.phase('parser'):
+                _parse_all(stream, ast)
+    except SyntaxError as error:
+        # Línea del token donde se detuvo el análisis (o del último, si se acabaron)
+        token = stream.peek() or (tokens[-1] if tokens else None)
+        line = token[2] if token else None
+        if stats is not None:
+            stats.count_ast(ast)
+        return len(tokens), len(ast), [{'line': line, 'message': str(error)}]
+
+    if stats is not None:
+        stats.count_ast(ast)
+    if errors:
+        return len(tokens), len(ast), errors
+
+    if cache is not None:
+        cache.put(source_code, tokens, ast)
+    return len(tokens), len(ast), []
+
+
+def analyze_file(path, cache_dir=None, cache_size=MAX_BYTES, profile=False, recover=False):
+    """
+    Analiza un archivo y devuelve su resultado como diccionario.
+    Si se indica `cache_dir`, reutiliza los resultados guardados de fuentes idénticas.
+    Con `profile`, el resultado incluye las estadísticas por fase en 'profile',
+    salvo en los aciertos de caché, que no ejecutan ninguna fase.
+    Con `recover`, se reportan todos los errores del archivo y no solo el primero.
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, encoding='utf-8') as file:
+            source_code = file.read()
+    except (OSError, UnicodeDecodeError) as error:
+        return {'file': path, 'tokens': 0, 'statements': 0,
+                'errors': [{'line': None, 'message': str(error)}], 'seconds': 0.0}
+
+    cache = cached = None
+    if cache_dir is not None:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = _caches[cache_dir] = AnalysisCache(cache_dir, cache_size)
+        cached = cache.get_counts(source_code)
+
+    stats = None
+    if cached is not None:
+        (tokens, statements), errors = cached, []
+    else:
+        stats = Stats() if profile else None
+        tokens, statements, errors = analyze_source(source_code, cache, stats, recover)
+
+    result = {
+        'file': path,
+        'tokens': tokens,
+        'statements': statements,
+        'errors': errors,
+        'seconds': time.perf_counter() - start,
+    }
+    if cache is not None:
+        result['cache'] = 'hit' if cached is not None else 'miss'
+    if stats is not None:
+        result['profile'] = stats.to_dict()
+    return result
+
+
+def run(paths, workers=None, chunksize=16, pattern='*', output=sys.stdout,
+        cache_dir=None, cache_size=MAX_BYTES, profile=False, recover=False):
+    """
+    Analiza todos los archivos y escribe un resultado JSON por línea en `output`.
+    Devuelve el resumen agregado como diccionario; con `profile`, incluye en
+    'profile' el Stats con la suma de las estadísticas de todos los archivos
+    analizados y en 'unprofiled_hits' cuántos aciertos de caché quedaron fuera.
+    """
+    totals = {'files': 0, 'tokens': 0, 'statements': 0, 'errors': 0, 'failed_files': 0}
+    if cache_dir is not None:
+        totals.update(cache_hits=0, cache_misses=0)
+    start = time.perf_counter()
+    files = expand_paths(paths, pattern)
+    if profile:
+        totals['profile'] = Stats()
+        totals['unprofiled_hits'] = 0
+    task = partial(analyze_file, cache_dir=cache_dir, cache_size=cache_size, profile=profile, recover=recover)
+
+    def consume(results):
+        for result in results:
+            totals['files'] += 1
+            totals['tokens'] += result['tokens']
+            totals['statements'] += result['statements']
+            totals['errors'] += len(result['errors'])
+            totals['failed_files'] += bool(result['errors'])
+            if 'cache' in result:
+                totals['cache_hits' if result['cache'] == 'hit' else 'cache_misses'] += 1
+            if 'profile' in result:
+                totals['profile'].merge(result['profile'])
+            elif profile and result.get('cache') == 'hit':
+                totals['unprofiled_hits'] += 1
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    if workers == 1:
+        consume(map(task, files))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            consume(executor.map(task, files, chunksize=chunksize))
+
+    elapsed = time.perf_counter() - start
+    totals['seconds'] = elapsed
+    totals['files_per_second'] = totals['files'] / elapsed if elapsed else 0.0
+    totals['tokens_per_second'] = totals['tokens'] / elapsed if elapsed else 0.0
+    return totals
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(
+        prog='analizador',
+        description='Analiza léxica y sintácticamente archivos fuente en paralelo.',
+    )
+    arguments.add_argument('paths', nargs='+', help='archivos, directorios o patrones glob')
+    arguments.add_argument('-j', '--workers', type=int, default=None,
+                           help='número de procesos (por defecto, uno por CPU)')
+    arguments.add_argument('--chunksize', type=int, default=16,
+                           help='archivos enviados a cada proceso por tarea')
+    arguments.add_argument('--pattern', default='*',
+                           help='patrón de nombre para los archivos de los directorios')
+    arguments.add_argument('--cache', metavar='DIR', default=None,
+                           help='directorio de la caché de resultados en disco')
+    arguments.add_argument('--cache-size', type=int, default=MAX_BYTES,
+                           help='tamaño máximo de la caché en bytes')
+    arguments.add_argument('--profile', action='store_true',
+                           help='mide cada fase e incluye las estadísticas en los resultados')
+    arguments.add_argument('--recover', action='store_true',
+                           help='sigue analizando tras cada error y los reporta todos')
+    options = arguments.parse_args(argv)
+
+    totals = run(options.paths, options.workers, options.chunksize, options.pattern,
+                 cache_dir=options.cache, cache_size=options.cache_size, profile=options.profile,
+                 recover=options.recover)
+    print(
+        f"{totals['files']} archivos, {totals['tokens']} tokens, {totals['statements']} sentencias, "
+        f"{totals['errors']} errores en {totals['seconds']:.2f} s "
+        f"({totals['files_per_second']:,.0f} archivos/s, {totals['tokens_per_second']:,.0f} tokens/s)",
+        file=sys.stderr,
+    )
+    if options.cache is not None:
+        print(f"caché: {totals['cache_hits']} aciertos, {totals['cache_misses']} fallos", file=sys.stderr)
+    if options.profile:
+        print(totals['profile'].report(), file=sys.stderr)
+        if totals['unprofiled_hits']:
+            print(f"({totals['unprofiled_hits']} aciertos de caché sin medir, excluidos del perfil)",
+                  file=sys.stderr)
+    return 1 if totals['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,512 @@
+import argparse
+import json
+import marshal
+import math
+import pickle
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from compiler import compile_program
+from evaluator import evaluate
+from flatast import FlatAST, flatten, tree_bytes
+from generator import count_statements, generate_program
+from interning import memory_report
+from lexer import LBRACE, RBRACE, SEMICOLON, TypeView, lex_offsets, lexer, lexer_backends
+from parallel import lex_parallel
+from parser import parser, statement_parser_reference, statement_parsers
+from positions import SourceIndex, Spans
+from tokenstore import lex_compact
+
+# Fragmento de código representativo que se repite para construir entradas grandes
+SAMPLE_CODE = """
+// Declaraciones iniciales
+int count = 0;
+float ratio = 1.5;
+result = (a + b) * 2 - c / 4; // expresión compuesta
+if (count == 0) {
+    count = count + 1;
+}
+"""
+
+
+def build_source(repetitions):
+    """
+    Construye un código fuente repitiendo SAMPLE_CODE el número de veces indicado.
+    """
+    return SAMPLE_CODE * repetitions
+
+
+def bench_lexer(repetitions=2000, rounds=3):
+    """
+    Mide tokens por segundo de cada implementación del analizador léxico.
+    Devuelve un diccionario {nombre: tokens_por_segundo}.
+    """
+    source = build_source(repetitions)
+    expected = None
+    results = {}
+
+    for name, lex in lexer_backends.items():
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            tokens = lex(source)
+            best = min(best, time.perf_counter() - start)
+
+        # Todas las implementaciones deben producir exactamente los mismos tokens
+        if expected is None:
+            expected = tokens
+        elif tokens != expected:
+            raise AssertionError(f"El backend '{name}' produjo tokens distintos")
+
+        results[name] = len(tokens) / best
+        print(f"{name:>10}: {len(tokens)} tokens en {best:.4f} s -> {results[name]:,.0f} tokens/s")
+
+    return results
+
+
+def token_list_bytes(tokens):
+    """
+    Memoria ocupada por una lista de tuplas de tokens: la lista, cada tupla y
+    cada objeto distinto que contienen (contado una sola vez).
+    """
+    seen = set()
+    total = sys.getsizeof(tokens)
+    for token in tokens:
+        total += sys.getsizeof(token)
+        for item in token:
+            if id(item) not in seen:
+                seen.add(id(item))
+                total += sys.getsizeof(item)
+    return total
+
+
+def bench_token_memory(repetitions=2000):
+    """
+    Compara los bytes por token de la lista de tuplas y del TokenStore.
+    """
+    source = build_source(repetitions)
+    tokens = lexer(source)
+    store = lex_compact(source)
+    if store != tokens:
+        raise AssertionError("El TokenStore no coincide con lexer()")
+
+    before = token_list_bytes(tokens) / len(tokens)
+    after = (store.nbytes() + sys.getsizeof(store)) / len(store)
+    print(f"  tuplas: {before:.1f} bytes/token")
+    print(f"  TokenStore: {after:.1f} bytes/token ({before / after:.1f}x menos)")
+    return before, after
+
+
+def bench_parallel_lexer(repetitions=2000, rounds=3):
+    """
+    Mide la escalabilidad de lex_parallel con 1, 2, 4 y 8 procesos.
+    Devuelve un diccionario {procesos: tokens_por_segundo}.
+    """
+    source = build_source(repetitions)
+    expected = lexer(source)
+    results = {}
+
+    for workers in (1, 2, 4, 8):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Ronda previa para arrancar los procesos fuera de la medición
+            lex_parallel(source, workers, min_chunk=1, executor=executor)
+            best = float('inf')
+            for _ in range(rounds):
+                start = time.perf_counter()
+                tokens = lex_parallel(source, workers, min_chunk=1, executor=executor)
+                best = min(best, time.perf_counter() - start)
+
+        if tokens != expected:
+            raise AssertionError(f"lex_parallel con {workers} procesos no coincide con lexer()")
+
+        results[workers] = len(tokens) / best
+        speedup = results[workers] / results[1]
+        print(f"{workers:>3} procesos: {best:.4f} s -> {results[workers]:,.0f} tokens/s ({speedup:.2f}x)")
+
+    return results
+
+
+def bench_compiled(runs=20000):
+    """
+    Compara la ejecución del programa de ejemplo con el evaluador de referencia
+    y con la función compilada. Devuelve las ejecuciones por segundo de cada uno.
+    """
+    ast = parser(lexer(SAMPLE_CODE))
+    program = compile_program(ast)
+    inputs = [{'a': i, 'b': i % 7, 'c': 2.5} for i in range(runs)]
+
+    results = {}
+    for name, run in (('árbol', lambda row: evaluate(ast, row)), ('compilado', program)):
+        start = time.perf_counter()
+        outputs = [run(row) for row in inputs]
+        elapsed = time.perf_counter() - start
+        results[name] = (runs / elapsed, outputs)
+        print(f"{name:>10}: {runs} ejecuciones en {elapsed:.4f} s -> {runs / elapsed:,.0f} ejecuciones/s")
+
+    if results['árbol'][1] != results['compilado'][1]:
+        raise AssertionError("El programa compilado no coincide con el evaluador de referencia")
+
+    speedup = results['compilado'][0] / results['árbol'][0]
+    print(f"  aceleración: {speedup:.1f}x")
+    return {name: rate for name, (rate, _) in results.items()}
+
+
+def bench_vectorized(rows=1000000):
+    """
+    Evalúa el programa de ejemplo sobre `rows` filas con NumPy y reporta filas/s.
+    Comprueba las primeras filas contra el evaluador de referencia.
+    """
+    import numpy as np
+
+    from vectorized import check_rows, evaluate_batch
+
+    ast = parser(lexer(SAMPLE_CODE))
+    generator = np.random.default_rng(0)
+    arrays = {
+        'a': generator.integers(-100, 100, rows),
+        'b': generator.integers(-100, 100, rows),
+        'c': generator.random(rows) * 10,
+    }
+
+    check_rows(ast, arrays, rows=1000)
+
+    start = time.perf_counter()
+    evaluate_batch(ast, arrays)
+    elapsed = time.perf_counter() - start
+    print(f"  {rows} filas en {elapsed:.4f} s -> {rows / elapsed:,.0f} filas/s")
+    return rows / elapsed
+
+
+def bench_dag_memory(repetitions=2000):
+    """
+    Compara la memoria de las expresiones del AST como árbol y como grafo compartido.
+    """
+    report = memory_report(lexer(build_source(repetitions)))
+    print(f"  árbol: {report['tree_objects']:,} objetos, {report['tree_bytes']:,} bytes")
+    print(f"  grafo: {report['dag_objects']:,} objetos, {report['dag_bytes']:,} bytes "
+          f"({report['ratio']:.1f}x menos, {report['unique_nodes']} nodos únicos)")
+    return report
+
+
+def bench_positions(repetitions=2000, rounds=3):
+    """
+    Compara lexer() (cuenta líneas) con lex_offsets() (solo posiciones) y mide
+    lo que cuesta construir la tabla de tramos y el índice de líneas aparte.
+    """
+    source = build_source(repetitions)
+    results = {}
+    for name, lex in (('lexer', lexer), ('lex_offsets', lex_offsets)):
+        best, tokens = _best_time(lex, source, rounds)
+        results[name] = len(tokens) / best
+        print(f"{name:>12}: {best:.4f} s -> {results[name]:,.0f} tokens/s")
+
+    ast = parser(tokens)
+    best, spans = _best_time(lambda ast: Spans(ast, tokens), ast, rounds)
+    print(f"{'Spans':>12}: {best:.4f} s para {len(spans):,} nodos")
+    best, _ = _best_time(lambda index: index.location(len(source) - 1), SourceIndex(source), 1)
+    print(f"{'SourceIndex':>12}: {best:.4f} s para la primera consulta (construye la tabla)")
+    return results
+
+
+def bench_numpy_lexer(megabytes=128, section=8):
+    """
+    Compara el lexer vectorizado con NumPy con los backends de regex sobre una
+    entrada de `megabytes` MB (programas sintéticos de generator.py). La entrada
+    se analiza por secciones de `section` MB cortadas en saltos de línea, para
+    no tener todos los tokens en memoria a la vez; en cada sección se comprueba
+    que lexer_numpy() produce los mismos tokens que lexer().
+    Devuelve un diccionario {nombre: MB/s}.
+    """
+    from numpy_lexer import lexer_numpy
+
+    block = generate_program(20000, seed=0)
+    source = block * max(1, megabytes * 2 ** 20 // len(block))
+    backends = {'lexer': lexer, 'lex_offsets': lex_offsets, 'lex_compact': lex_compact, 'lexer_numpy': lexer_numpy}
+    times = dict.fromkeys(backends, 0.0)
+    token_count = 0
+
+    start = 0
+    line_number = 1
+    while start < len(source):
+        end = source.find('\n', start + section * 2 ** 20) + 1 or len(source)
+        piece = source[start:end]
+        expected = None
+        for name, lex in backends.items():
+            begin = time.perf_counter()
+            tokens = lex(piece, line_number) if name in ('lexer', 'lexer_numpy') else lex(piece)
+            times[name] += time.perf_counter() - begin
+            if name == 'lexer':
+                expected = tokens
+                token_count += len(tokens)
+            elif name == 'lexer_numpy' and tokens != expected:
+                raise AssertionError(f"lexer_numpy no coincide con lexer() en la línea {line_number}")
+            del tokens
+        expected = None
+        line_number += piece.count('\n')
+        start = end
+
+    size = len(source) / 2 ** 20
+    results = {}
+    for name, elapsed in times.items():
+        results[name] = size / elapsed
+        print(f"{name:>12}: {size:.0f} MB, {token_count:,} tokens en {elapsed:.2f} s -> "
+              f"{results[name]:,.1f} MB/s ({token_count / elapsed:,.0f} tokens/s, "
+              f"{times['lexer'] / elapsed:.2f}x)")
+    return results
+
+
+def bench_flat_ast(repetitions=2000, rounds=3):
+    """
+    Compara el AST de tuplas con el FlatAST: memoria, conversión y tiempo de
+    serialización (pickle y marshal frente a to_bytes/from_bytes) sobre un
+    programa sintético de 10 * `repetitions` sentencias.
+    """
+    ast = parser(lexer(generate_program(10 * repetitions, seed=0)))
+    best, flat = _best_time(flatten, ast, rounds)
+    print(f"  flatten: {best:.4f} s para {len(flat):,} nodos")
+    best, tuples = _best_time(FlatAST.to_tuples, flat, rounds)
+    if tuples != ast:
+        raise AssertionError("El FlatAST no coincide con el AST de tuplas")
+    print(f"  to_tuples: {best:.4f} s")
+
+    tree_objects, before = tree_bytes(ast)
+    after = flat.nbytes()
+    print(f"  tuplas: {tree_objects:,} objetos, {before:,} bytes")
+    print(f"  FlatAST: {after:,} bytes ({before / after:.1f}x menos)")
+
+    results = {'tree_bytes': before, 'flat_bytes': after}
+    formats = (
+        ('pickle', ast, lambda ast: pickle.dumps(ast, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        ('marshal', ast, marshal.dumps, marshal.loads),
+        ('FlatAST', flat, FlatAST.to_bytes, FlatAST.from_bytes),
+        ('FlatAST+tuplas', flat, FlatAST.to_bytes, lambda data: FlatAST.from_bytes(data).to_tuples()),
+    )
+    for name, value, dump, load in formats:
+        dump_time, data = _best_time(dump, value, rounds)
+        load_time, loaded = _best_time(load, data, rounds)
+        if loaded != ast:
+            raise AssertionError(f"{name} no reconstruye el mismo AST")
+        results[name] = (dump_time, load_time, len(data))
+        print(f"{name:>16}: {len(data):,} bytes, escritura {dump_time * 1000:.2f} ms, "
+              f"lectura {load_time * 1000:.2f} ms")
+    return results
+
+
+def bench_statements(repetitions=2000, rounds=3):
+    """
+    Mide el despacho de sentencias sobre un programa sintético de
+    10 * `repetitions` sentencias:
+    - 'tabla' busca la función en `statement_parsers` con la clase del primer
+      token; 'if/elif' es la cadena original (`statement_parser_reference`)
+      sobre los mismos tokens con tipo de texto. Ambas deben elegir lo mismo.
+    - Sentencias por segundo del parser completo con los tokens con clase y
+      con tipo de texto (`TypeView`, que el parser vuelve a convertir).
+    """
+    source_code = generate_program(10 * repetitions, seed=0)
+    tokens = lexer(source_code)
+    texts = list(TypeView(tokens))
+
+    # Primer token de cada sentencia (o el '}' que cierra un bloque)
+    firsts = [0] + [index + 1 for index, token in enumerate(tokens[:-1])
+                    if token[0] in (SEMICOLON, LBRACE, RBRACE)]
+    kind_tokens = [tokens[index] for index in firsts] * 10
+    text_tokens = [texts[index] for index in firsts] * 10
+    select = statement_parsers.get
+    dispatchers = (
+        ('tabla', lambda tokens: [select(token[0]) for token in tokens], kind_tokens),
+        ('if/elif', lambda tokens: [statement_parser_reference(token) for token in tokens], text_tokens),
+    )
+    results = {}
+    chosen = []
+    for name, dispatch, argument in dispatchers:
+        best, functions = _best_time(dispatch, argument, rounds)
+        results[name] = len(argument) / best
+        chosen.append(functions)
+        print(f"{name:>8}: {results[name]:,.0f} despachos/s")
+    if chosen[0] != chosen[1]:
+        raise AssertionError("La tabla y la cadena de if/elif eligen funciones distintas")
+    print(f"  tabla / if-elif: {results['tabla'] / results['if/elif']:.2f}x")
+
+    asts = []
+    for name, argument in (('clases', tokens), ('texto', texts)):
+        best, ast = _best_time(parser, argument, rounds)
+        results[name] = count_statements(ast) / best
+        asts.append(ast)
+        print(f"{name:>8}: {results[name]:,.0f} sentencias/s")
+    if asts[0] != asts[1]:
+        raise AssertionError("Los tokens con tipo de texto producen otro AST")
+    return results
+
+
+# === SUITE DE RENDIMIENTO ===
+# Mide lexer() y parser() por separado sobre programas sintéticos de tamaño
+# creciente (ver generator.py), reporta tokens/s, sentencias/s y memoria pico, y
+# ajusta el tiempo contra el tamaño para detectar crecimiento más que lineal.
+
+# Exponente máximo aceptado en el ajuste tiempo ~ tamaño^k (1.0 es lineal)
+MAX_EXPONENT = 1.3
+# Caída máxima de rendimiento aceptada frente a una ejecución anterior
+REGRESSION_TOLERANCE = 0.2
+
+
+def _best_time(function, argument, rounds):
+    """
+    Ejecuta `function(argument)` varias veces y devuelve (mejor tiempo, resultado).
+    """
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _peak_memory(function, argument):
+    """
+    Memoria pico (bytes) reservada durante `function(argument)`, medida aparte
+    porque tracemalloc hace más lento el código que observa.
+    """
+    tracemalloc.start()
+    try:
+        function(argument)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def fit_exponent(sizes, times):
+    """
+    Pendiente de la recta de mínimos cuadrados de log(tiempo) contra log(tamaño).
+    Vale ~1 si el tiempo crece linealmente y ~2 si crece cuadráticamente.
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(elapsed, 1e-9)) for elapsed in times]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def run_suite(statements=20000, seed=0, rounds=3, steps=4, depth=3, nesting=2, comments=0.1,
+              lex=lexer, parse=parser):
+    """
+    Ejecuta la suite con programas de statements, statements/2, ... sentencias.
+    Devuelve un diccionario serializable a JSON con los parámetros, las medidas
+    de cada tamaño, el exponente de cada etapa y las etapas que no son lineales.
+    """
+    sizes = sorted({max(statements >> step, 1) for step in range(steps)})
+    runs = []
+    for size in sizes:
+        source = generate_program(size, seed=seed, depth=depth, nesting=nesting, comments=comments)
+        lex_time, tokens = _best_time(lex, source, rounds)
+        parse_time, ast = _best_time(parse, tokens, rounds)
+        runs.append({
+            'statements': count_statements(ast),
+            'bytes': len(source),
+            'tokens': len(tokens),
+            'lexer_seconds': lex_time,
+            'parser_seconds': parse_time,
+            'tokens_per_second': len(tokens) / lex_time,
+            'statements_per_second': count_statements(ast) / parse_time,
+            'lexer_peak_bytes': _peak_memory(lex, source),
+            'parser_peak_bytes': _peak_memory(parse, tokens),
+        })
+
+    exponents = {}
+    if len(runs) > 1:
+        for stage in ('lexer', 'parser'):
+            exponents[stage] = fit_exponent([run['bytes'] for run in runs],
+                                            [run[f'{stage}_seconds'] for run in runs])
+    return {
+        'parameters': {'statements': statements, 'seed': seed, 'rounds': rounds, 'steps': steps,
+                       'depth': depth, 'nesting': nesting, 'comments': comments},
+        'python': platform.python_version(),
+        'runs': runs,
+        'exponents': exponents,
+        'nonlinear': sorted(stage for stage, value in exponents.items() if value > MAX_EXPONENT),
+    }
+
+
+def compare_results(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compara dos resultados de run_suite con los mismos tamaños. Devuelve una
+    lista de mensajes, uno por medida que empeoró más que `tolerance`.
+    """
+    previous = {run['statements']: run for run in baseline['runs']}
+    regressions = []
+    for run in current['runs']:
+        before = previous.get(run['statements'])
+        if before is None:
+            continue
+        for metric in ('tokens_per_second', 'statements_per_second'):
+            if run[metric] < before[metric] * (1 - tolerance):
+                regressions.append(f"{run['statements']} sentencias: {metric} bajó de "
+                                   f"{before[metric]:,.0f} a {run[metric]:,.0f}")
+    return regressions
+
+
+def bench_suite(statements=20000, output=None, baseline=None, seed=0):
+    """
+    Ejecuta run_suite, muestra la tabla de resultados y, si se indican, guarda
+    el JSON en `output` y compara con el JSON de `baseline`. Lanza AssertionError
+    si alguna etapa crece más que linealmente o si hay regresiones.
+    """
+    results = run_suite(statements, seed=seed)
+    for run in results['runs']:
+        print(f"{run['statements']:>9} sentencias: lexer {run['tokens_per_second']:>12,.0f} tokens/s "
+              f"({run['lexer_peak_bytes'] / 2**20:.1f} MiB), parser {run['statements_per_second']:>10,.0f} "
+              f"sentencias/s ({run['parser_peak_bytes'] / 2**20:.1f} MiB)")
+    for stage, exponent in results['exponents'].items():
+        print(f"  {stage}: tiempo ~ tamaño^{exponent:.2f}")
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    problems = [f"{stage} crece más que linealmente" for stage in results['nonlinear']]
+    if baseline:
+        with open(baseline, encoding='utf-8') as file:
+            problems += compare_results(results, json.load(file))
+    for problem in problems:
+        print(f"  ✖ {problem}")
+    if problems:
+        raise AssertionError(f"{len(problems)} problemas de rendimiento")
+    return results
+
+
+# Pruebas disponibles desde la línea de comandos
+benchmarks = {
+    'lexer': bench_lexer,
+    'tokens': bench_token_memory,
+    'parallel': bench_parallel_lexer,
+    'compiled': bench_compiled,
+    'vectorized': bench_vectorized,
+    'dag': bench_dag_memory,
+    'positions': bench_positions,
+    'numpy_lexer': bench_numpy_lexer,
+    'flat_ast': bench_flat_ast,
+    'statements': bench_statements,
+    'suite': bench_suite,
+}
+
+
+if __name__ == "__main__":
+    # Uso: python benchmark.py [nombre] [repeticiones] [--json salida] [--baseline anterior]
+    arguments = argparse.ArgumentParser(description='Pruebas de rendimiento del analizador.')
+    arguments.add_argument('name', nargs='?', choices=list(benchmarks), help='prueba a ejecutar (todas si se omite)')
+    arguments.add_argument('reps', nargs='?', type=int, default=None,
+                           help='tamaño de la prueba (por defecto, el propio de cada prueba)')
+    arguments.add_argument('--json', metavar='ARCHIVO', help='guarda el resultado de la suite en JSON')
+    arguments.add_argument('--baseline', metavar='ARCHIVO', help='compara la suite con un JSON anterior')
+    arguments.add_argument('--seed', type=int, default=0, help='semilla del generador de la suite')
+    options = arguments.parse_args()
+
+    names = [options.name] if options.name else list(benchmarks)
+    size = () if options.reps is None else (options.reps,)
+    for name in names:
+        print(f"=== {name} ===")
+        if name == 'suite':
+            bench_suite(*size, output=options.json, baseline=options.baseline, seed=options.seed)
+        else:
+            benchmarks[name](*size)
@@ -0,0 +1,193 @@
+import hashlib
+import marshal
+import os
+import struct
+import tempfile
+
+from lexer import kind_types, kind_values, lexer, token_definitions
+from parser import parser, precedence
+
+# === CACHÉ EN DISCO DE TOKENS Y AST ===
+# Cada entrada se guarda en un archivo cuyo nombre es el hash del contenido de la
+# fuente junto con una versión derivada de `token_definitions`, de las clases
+# de token y de `precedence`: si cambia la gramática, las entradas antiguas
+# dejan de coincidir.
+# Cada archivo empieza con una cabecera con el número de tokens y de sentencias,
+# seguida de los tokens y el AST en formato `marshal`, que serializa tuplas,
+# listas, cadenas y números muy rápido. Quien solo necesita los totales (el
+# analizador por lotes) lee la cabecera sin cargar el resto. La fecha de
+# modificación de cada archivo hace de marca de "último uso" para el desalojo LRU.
+
+# Cabecera de cada entrada: número de tokens y de sentencias
+_HEADER = struct.Struct('<QQ')
+
+# Versión del contenido de la caché
+CACHE_VERSION = hashlib.blake2b(
+    repr((token_definitions, kind_types, sorted(kind_values.items()), sorted(precedence.items()),
+          marshal.version, _HEADER.format)).encode(),
+    digest_size=8,
+).hexdigest()
+
+# Tamaño máximo por defecto de la caché en disco
+MAX_BYTES = 256 * 1024 * 1024
+
+
+class AnalysisCache:
+    """
+    Caché persistente de resultados de lexer + parser indexada por contenido.
+    Las escrituras son atómicas (archivo temporal + os.replace), así que varios
+    procesos pueden compartir el mismo directorio sin corromperlo.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None       # Tamaño total estimado; se calcula al primer uso
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source_code):
+        """
+        Clave de una fuente: hash de su contenido y de la versión de la caché.
+        """
+        digest = hashlib.blake2b(CACHE_VERSION.encode(), digest_size=20)
+        digest.update(source_code.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        # Dos niveles de directorio para no acumular miles de archivos en uno solo
+        return os.path.join(self.directory, key[:2], key[2:] + '.bin')
+
+    def get(self, source_code):
+        """
+        Devuelve (tokens, ast) si la fuente está en la caché, o None.
+        """
+        return self._read(source_code, lambda file: marshal.loads(file.read()[_HEADER.size:]))
+
+    def get_counts(self, source_code):
+        """
+        Devuelve (número de tokens, número de sentencias) si la fuente está en
+        la caché, o None. Solo lee la cabecera de la entrada.
+        """
+        return self._read(source_code, lambda file: _HEADER.unpack(file.read(_HEADER.size)))
+
+    def _read(self, source_code, load):
+        """
+        Lee la entrada de una fuente con `load(archivo)` y actualiza las
+        estadísticas y la marca de último uso. Devuelve None si no está.
+        """
+        path = self._path(self.key(source_code))
+        try:
+            with open(path, 'rb') as file:
+                result = load(file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            # Entrada ilegible: se descarta y se trata como fallo
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # Marca la entrada como usada recientemente
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, source_code, tokens, ast):
+        """
+        Guarda el resultado de una fuente de forma atómica.
+        """
+        path = self._path(self.key(source_code))
+        data = _HEADER.pack(len(tokens), len(ast)) + marshal.dumps((list(tokens), ast))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)    # La entrada se sobrescribe
+        except OSError:
+            previous = 0
+
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            self._remove(temporary)
+            raise
+
+        if self._size is None:
+            self._size = self._disk_size()
+        else:
+            self._size += len(data) - previous
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def analyze(self, source_code):
+        """
+        Devuelve (tokens, ast) de la fuente, usando la caché si es posible.
+        """
+        cached = self.get(source_code)
+        if cached is not None:
+            return cached
+        tokens = lexer(source_code)
+        ast = parser(tokens)
+        self.put(source_code, tokens, ast)
+        return tokens, ast
+
+    def evict(self, target=None):
+        """
+        Elimina las entradas usadas hace más tiempo hasta bajar de `target` bytes
+        (por defecto, el 90 % del máximo).
+        """
+        target = self.max_bytes * 9 // 10 if target is None else target
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        for path, _, entry_size in entries:
+            if size <= target:
+                break
+            if self._remove(path):
+                self.evictions += 1
+            size -= entry_size
+        self._size = size
+
+    def stats(self):
+        """
+        Estadísticas de uso de la caché.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+        }
+
+    def _entries(self):
+        # (ruta, último uso, tamaño) de cada entrada en disco
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith('.bin'):
+                    try:
+                        info = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield entry.path, info.st_mtime, info.st_size
+
+    def _disk_size(self):
+        return sum(entry[2] for entry in self._entries())
+
+    @staticmethod
+    def _remove(path):
+        # Otro proceso puede haberla borrado ya
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
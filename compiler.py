@@ -0,0 +1,250 @@
+import math
+import re
+from collections import OrderedDict
+
+from evaluator import INTERNAL_PREFIX, declared_types, divide
+from treewalk import Blocks, postorder
+
+# === COMPILADOR A CÓDIGO PYTHON ===
+# Traduce el AST de `parser` a una función de Python que se compila una sola vez
+# y luego se puede llamar muchas veces con distintas entradas. Tiene la misma
+# semántica que `evaluator.evaluate` (ver evaluator.py).
+#
+# Las variables del programa se guardan en variables locales numeradas (v0, v1,
+# ... y su conversión en t0, t1, ...): los nombres del código fuente nunca se
+# copian al código generado salvo como claves de diccionario (con repr), porque
+# Python no acepta todos los identificadores de `lexer` (por ejemplo 'a²') y
+# normaliza otros (NFKC), lo que fundiría variables distintas como 'aﬁ' y 'afi'.
+#
+# Para no depender de los límites de anidamiento del compilador de Python:
+# - Las subexpresiones muy profundas se guardan en variables temporales.
+# - Los cuerpos de los if no se anidan: cada if calcula una bandera (que vale
+#   False si el if que lo contiene no se ejecutó) y sus sentencias se ejecutan
+#   bajo un único `if bandera:`.
+
+# Profundidad máxima de una expresión antes de guardarla en una temporal
+MAX_EXPRESSION_DEPTH = 32
+
+
+def _same(value):
+    # Conversión de las variables que aún no tienen tipo declarado
+    return value
+
+
+def _unset(error, names):
+    """
+    Traduce la lectura de una variable local sin valor (v0, v1, ...) al mismo
+    NameError que lanza `evaluator.evaluate`, con el nombre del programa.
+    """
+    match = re.search(r"'v(\d+)'", str(error))
+    if match is None:
+        return error
+    return NameError(f"Variable sin valor: {names[int(match.group(1))]}")
+
+
+def _constant(value):
+    # Texto de una constante; inf y nan (p. ej. de un literal enorme o del
+    # plegado de constantes) no tienen literal en Python
+    return repr(value) if not isinstance(value, float) or math.isfinite(value) else f'float({repr(value)!r})'
+
+
+# Nombres disponibles dentro del código generado
+_GLOBALS = {'_div': divide, '_same': _same, '_unset': _unset,
+            **{f'_{name}': convert for name, convert in declared_types.items()}}
+
+
+class _Emitter:
+    """
+    Genera las líneas del código fuente de la función compilada.
+    """
+
+    def __init__(self, variables):
+        self.variables = variables  # Nombre -> número de la variable local
+        self.lines = []
+        self.counter = 0
+        self.guard = None       # Bandera del bloque `if` abierto al final de `lines`
+
+    def fresh(self, prefix):
+        self.counter += 1
+        return f'{prefix}{self.counter}'
+
+    def emit(self, guard, lines):
+        """
+        Añade líneas que solo se ejecutan si `guard` es verdadera (None: siempre).
+        Las líneas consecutivas con la misma bandera comparten el mismo bloque.
+        """
+        if guard is None:
+            self.lines.extend('    ' + line for line in lines)
+        else:
+            if self.guard != guard:
+                self.lines.append(f'    if {guard}:')
+            self.lines.extend('        ' + line for line in lines)
+        self.guard = guard
+
+    def expression(self, node, out):
+        """
+        Devuelve el texto de la expresión; las temporales necesarias se añaden a `out`.
+        """
+        results = []                 # Pares (texto, profundidad)
+        for current in postorder(node):
+            if not isinstance(current, tuple):
+                results.append((f'v{self.variables[current]}' if isinstance(current, str) else _constant(current), 0))
+                continue
+
+            (right, right_depth), (left, left_depth) = results.pop(), results.pop()
+            op = current[0]
+            if op == '/':
+                text = f'_div({left}, {right})'
+            elif op == '==':
+                text = f'(1 if {left} == {right} else 0)'
+            else:
+                text = f'({left} {op} {right})'
+            depth = max(left_depth, right_depth) + 1
+
+            if depth > MAX_EXPRESSION_DEPTH:
+                temporary = self.fresh('_t')
+                out.append(f'{temporary} = {text}')
+                text, depth = temporary, 0
+            results.append((text, depth))
+
+        return results[-1][0]
+
+
+def _collect_names(ast):
+    """
+    Devuelve (nombres usados, nombres declarados, nombres asignados siempre en el nivel superior).
+    """
+    names, declared = set(), set()
+    top_level = {statement[2] if statement[0] == 'DECLARATION' else statement[1]
+                 for statement in ast if statement[0] != 'IF'}
+
+    stack = list(ast)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            names.add(node)
+        elif isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, tuple):
+            if node[0] == 'DECLARATION':
+                names.add(node[2])
+                declared.add(node[2])
+                stack.extend(node[3:])
+            elif node[0] == 'ASSIGNMENT':
+                names.add(node[1])
+                stack.append(node[2])
+            else:
+                # IF (condición y cuerpo) o expresión binaria (operandos)
+                stack.extend(node[1:])
+    return names, declared, top_level
+
+
+def generate_source(ast):
+    """
+    Genera el código fuente de la función `program(inputs)` para un AST.
+    """
+    names, declared, top_level = _collect_names(ast)
+    sorted_names = sorted(names)
+    variables = {name: number for number, name in enumerate(sorted_names)}
+    emitter = _Emitter(variables)
+
+    # Prólogo: entradas y tipos aún sin declarar
+    prologue = [f'if {name!r} in inputs: v{variables[name]} = inputs[{name!r}]' for name in sorted_names]
+    prologue += [f't{variables[name]} = _same' for name in sorted(declared)]
+    emitter.emit(None, prologue)
+
+    # Cuerpo: el estado de cada bloque es la bandera que lo protege
+    blocks = Blocks(ast)
+    for statement, guard in blocks:
+        lines = []
+        kind = statement[0]
+        if kind == 'DECLARATION':
+            _, type_name, name = statement[:3]
+            number = variables[name]
+            if len(statement) > 3:
+                lines.append(f'v{number} = _{type_name}({emitter.expression(statement[3], lines)})')
+            else:
+                lines.append(f'v{number} = {declared_types[type_name](0)!r}')
+            lines.append(f't{number} = _{type_name}')
+            emitter.emit(guard, lines)
+
+        elif kind == 'ASSIGNMENT':
+            _, name, expr = statement
+            value = emitter.expression(expr, lines)
+            number = variables[name]
+            lines.append(f'v{number} = t{number}({value})' if name in declared else f'v{number} = {value}')
+            emitter.emit(guard, lines)
+
+        elif kind == 'IF':
+            flag = emitter.fresh('_f')
+            if guard is not None:
+                emitter.emit(None, [f'{flag} = False'])
+            condition = emitter.expression(statement[1], lines)
+            lines.append(f'{flag} = {condition} != 0')
+            emitter.emit(guard, lines)
+            blocks.enter(statement[2], flag)
+
+        else:
+            raise ValueError(f"Sentencia desconocida: {kind}")
+
+    # Epílogo: variables finales (las que tienen valor), sin las internas
+    epilogue = ['result = dict(inputs)']
+    for name in sorted_names:
+        if name.startswith(INTERNAL_PREFIX):
+            continue
+        if name in top_level:
+            epilogue.append(f'result[{name!r}] = v{variables[name]}')
+        else:
+            epilogue += ['try:', f'    result[{name!r}] = v{variables[name]}', 'except NameError:', '    pass']
+    epilogue.append('return result')
+    emitter.emit(None, epilogue)
+
+    # Todo el cuerpo queda dentro de un try (sin costo mientras no hay errores)
+    body = '\n'.join('    ' + line for line in emitter.lines)
+    return (f'def program(inputs):\n    try:\n{body}\n'
+            f'    except UnboundLocalError as error:\n        raise _unset(error, {tuple(sorted_names)!r}) from None\n')
+
+
+def _freeze(ast):
+    """
+    Convierte el AST en una tupla plana (recorrido en preorden) que sirve como
+    clave de caché. Es iterativo para admitir programas muy anidados.
+    """
+    flat = []
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            flat.append((type(node).__name__, len(node)))
+            stack.extend(reversed(node))
+        else:
+            flat.append((type(node).__name__, node))
+    return tuple(flat)
+
+
+# Programas ya compilados, del menos al más recientemente usado
+_compiled = OrderedDict()
+MAX_COMPILED = 256
+
+
+def compile_program(ast):
+    """
+    Compila el AST a una función `program(inputs) -> variables finales`.
+    Los programas ya compilados se reutilizan desde una caché LRU.
+    """
+    key = _freeze(ast)
+    program = _compiled.get(key)
+    if program is not None:
+        _compiled.move_to_end(key)
+        return program
+
+    source = generate_source(ast)
+    namespace = dict(_GLOBALS)
+    exec(compile(source, '<analizador>', 'exec'), namespace)
+    program = namespace['program']
+    program.source = source  # Código generado, útil para depurar
+
+    _compiled[key] = program
+    if len(_compiled) > MAX_COMPILED:
+        _compiled.popitem(last=False)
+    return program
@@ -0,0 +1,117 @@
+import operator
+
+from treewalk import Blocks, postorder
+
+# === EVALUADOR DE REFERENCIA ===
+# Recorre el AST que produce `parser` y ejecuta el programa sobre un diccionario
+# de variables. Es lento pero simple: sirve para comprobar que otros motores
+# de ejecución conservan la semántica del lenguaje. El recorrido usa pilas
+# explícitas (ver treewalk.py), así que admite cualquier anidamiento.
+#
+# Semántica:
+# - Los números enteros son int y los decimales float.
+# - '+', '-' y '*' se comportan como en Python; '/' entre dos int trunca hacia
+#   cero (como en C) y en otro caso es división real.
+# - '==' vale 1 si los operandos son iguales y 0 si no.
+# - Un if ejecuta su cuerpo si la condición es distinta de 0.
+# - `int x = e;` guarda int(e) y `float x = e;` guarda float(e); sin valor
+#   inicial guardan 0 o 0.0. Desde la declaración, cada asignación a la
+#   variable convierte el valor a su tipo.
+# - Leer una variable sin valor lanza NameError.
+# - Las variables cuyo nombre empieza por INTERNAL_PREFIX son internas de los
+#   motores (por ejemplo, las temporales de optimizer.py) y no aparecen en el
+#   resultado. El lexer nunca produce ese carácter en un identificador, así que
+#   no chocan con las variables del programa.
+
+
+def divide(left, right):
+    """
+    División con la semántica del lenguaje: entera truncada si ambos son int.
+    """
+    if isinstance(left, int) and isinstance(right, int):
+        quotient = abs(left) // abs(right)
+        return quotient if (left >= 0) == (right >= 0) else -quotient
+    return left / right
+
+
+def equals(left, right):
+    """
+    Comparación de igualdad: devuelve 1 o 0.
+    """
+    return 1 if left == right else 0
+
+
+# Prefijo de las variables internas
+INTERNAL_PREFIX = '$'
+
+# Operaciones de cada operador binario
+binary_operations = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': divide,
+    '==': equals,
+}
+
+# Conversión aplicada por cada tipo declarable
+declared_types = {
+    'int': int,
+    'float': float,
+}
+
+
+def evaluate(ast, inputs=None):
+    """
+    Ejecuta el programa y devuelve el diccionario final de variables.
+    `inputs` da el valor inicial de las variables libres (por ejemplo a, b, c).
+    """
+    env = dict(inputs or {})
+    types = {}  # Tipo declarado de cada variable
+    execute_block(ast, env, types)
+    return {name: value for name, value in env.items() if not name.startswith(INTERNAL_PREFIX)}
+
+
+def execute_block(statements, env, types):
+    """
+    Ejecuta una lista de sentencias en orden.
+    """
+    blocks = Blocks(statements)
+    for statement, _ in blocks:
+        kind = statement[0]
+
+        if kind == 'DECLARATION':
+            convert = declared_types[statement[1]]
+            value = evaluate_expression(statement[3], env) if len(statement) > 3 else 0
+            types[statement[2]] = convert
+            env[statement[2]] = convert(value)
+
+        elif kind == 'ASSIGNMENT':
+            value = evaluate_expression(statement[2], env)
+            convert = types.get(statement[1])
+            env[statement[1]] = convert(value) if convert else value
+
+        elif kind == 'IF':
+            if evaluate_expression(statement[1], env) != 0:
+                blocks.enter(statement[2])
+
+        else:
+            raise ValueError(f"Sentencia desconocida: {kind}")
+
+
+def evaluate_expression(node, env):
+    """
+    Calcula el valor de una expresión.
+    """
+    results = []
+    for current in postorder(node):
+        if isinstance(current, tuple):
+            right = results.pop()
+            results.append(binary_operations[current[0]](results.pop(), right))
+        elif isinstance(current, str):
+            try:
+                results.append(env[current])
+            except KeyError:
+                raise NameError(f"Variable sin valor: {current}") from None
+        else:
+            results.append(current)
+    return results[-1]
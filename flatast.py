@@ -0,0 +1,250 @@
+import struct
+import sys
+from array import array
+
+from parser import precedence
+
+# === AST PLANO EN ARREGLOS TIPADOS ===
+# Representación alternativa del AST: en lugar de tuplas y listas anidadas con
+# enteros, flotantes y cadenas sueltos, los nodos se numeran en preorden y cada
+# columna es un arreglo tipado:
+# - kinds: código de la clase del nodo (un byte), ver `node_kinds`.
+# - sizes: número de nodos del subárbol (el nodo y sus descendientes), así
+#   que el primer hijo de i es i + 1 y el siguiente hermano, i + sizes[i].
+# - values: dato del nodo (entero de 32 bits): el índice del nombre en
+#   `strings` (NAME), el índice del tipo (DECLARATION), el número de
+#   sentencias del cuerpo (IF), el entero (INT) o su índice en `floats` (FLOAT).
+# - floats: constantes de punto flotante.
+# - strings: nombres distintos (variables y tipos), cada uno una sola vez.
+# El nombre de una declaración o asignación es su primer hijo, un nodo NAME;
+# le sigue la expresión (si la hay). Los enteros que no caben en 32 bits se
+# guardan como texto (BIGINT).
+#
+# La conversión con las tuplas de siempre es exacta en ambos sentidos.
+# `to_bytes` escribe las columnas tal cual tras una cabecera, y `from_bytes`
+# las lee sin copiarlas: las columnas pasan a ser memoryviews sobre el buffer
+# recibido (bytes, bytearray o mmap).
+
+node_kinds = ['DECLARATION', 'ASSIGNMENT', 'IF', 'NAME', 'INT', 'FLOAT', 'BIGINT'] + list(precedence)
+kind_codes = {kind: code for code, kind in enumerate(node_kinds)}
+
+DECLARATION, ASSIGNMENT, IF, NAME, INT, FLOAT, BIGINT = range(7)
+
+# Cabecera: marca, versión, orden de bytes, nodos, flotantes, nombres y bytes de los nombres
+_HEADER = struct.Struct('<4sBBxxQQQQ')
+_MAGIC = b'FAST'
+_VERSION = 1
+_BYTE_ORDER = 0 if sys.byteorder == 'little' else 1
+
+_INT32 = (-(1 << 31), (1 << 31) - 1)
+
+
+class FlatAST:
+    """
+    AST en columnas. Compara igual que la lista de sentencias de `parser`.
+    """
+
+    __slots__ = ('kinds', 'sizes', 'values', 'floats', 'strings')
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.sizes = array('I')
+        self.values = array('i')
+        self.floats = array('d')
+        self.strings = []
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __eq__(self, other):
+        if isinstance(other, FlatAST):
+            other = other.to_tuples()
+        if isinstance(other, list):
+            return self.to_tuples() == other
+        return NotImplemented
+
+    def __reduce__(self):
+        # Entre procesos viaja como su forma binaria
+        return (FlatAST.from_bytes, (self.to_bytes(),))
+
+    def statements(self):
+        """
+        Números de los nodos de las sentencias del nivel superior.
+        """
+        numbers = []
+        number = 0
+        sizes = self.sizes
+        while number < len(sizes):
+            numbers.append(number)
+            number += sizes[number]
+        return numbers
+
+    def node(self, number):
+        """
+        Tupla (o constante o nombre) del subárbol que empieza en `number`.
+        """
+        return self._build(number, number + self.sizes[number])[0]
+
+    def to_tuples(self):
+        """
+        AST como lista de tuplas, igual al que devuelve `parser`.
+        """
+        return self._build(0, len(self))
+
+    def _build(self, start, end):
+        """
+        Reconstruye los nodos [start, end) recorriéndolos al revés: al llegar a
+        un nodo, sus hijos ya están en la pila, el primero arriba.
+        """
+        kinds, sizes, values = self.kinds, self.sizes, self.values
+        floats, strings = self.floats, self.strings
+        stack = []
+        push, pop = stack.append, stack.pop
+        for number in range(end - 1, start - 1, -1):
+            kind = kinds[number]
+            value = values[number]
+            if kind == NAME:
+                push(strings[value])
+            elif kind == INT:
+                push(value)
+            elif kind == FLOAT:
+                push(floats[value])
+            elif kind == BIGINT:
+                push(int(strings[value]))
+            elif kind == ASSIGNMENT:
+                name = pop()
+                push(('ASSIGNMENT', name, pop()))
+            elif kind == DECLARATION:
+                name = pop()
+                if sizes[number] > 2:
+                    push(('DECLARATION', strings[value], name, pop()))
+                else:
+                    push(('DECLARATION', strings[value], name))
+            elif kind == IF:
+                condition = pop()
+                push(('IF', condition, [pop() for _ in range(value)]))
+            else:
+                left = pop()
+                push((node_kinds[kind], left, pop()))
+        stack.reverse()
+        return stack
+
+    def nbytes(self):
+        """
+        Memoria de las columnas y de la tabla de nombres.
+        """
+        columns = sum(column.itemsize * len(column) for column in (self.kinds, self.sizes, self.values, self.floats))
+        return columns + sys.getsizeof(self.strings) + sum(sys.getsizeof(name) for name in self.strings)
+
+    def to_bytes(self):
+        """
+        Forma binaria: cabecera, columnas en crudo (de mayor a menor tamaño de
+        elemento, así quedan alineadas) y nombres en UTF-8 separados por '\\0'.
+        """
+        names = '\0'.join(self.strings).encode('utf-8')
+        header = _HEADER.pack(_MAGIC, _VERSION, _BYTE_ORDER, len(self.kinds), len(self.floats),
+                              len(self.strings), len(names))
+        return b''.join((header, self.floats, self.values, self.sizes, self.kinds, names))
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        """
+        Lee la forma binaria sin copiar las columnas: son vistas sobre `buffer`,
+        que debe seguir sin cambios mientras se use el resultado.
+        """
+        view = memoryview(buffer).cast('B')
+        magic, version, byte_order, nodes, float_count, string_count, names_size = _HEADER.unpack_from(view)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("No es un AST plano de esta versión")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError("El AST plano se escribió con otro orden de bytes")
+
+        layout = (('floats', 'd', float_count), ('values', 'i', nodes), ('sizes', 'I', nodes), ('kinds', 'B', nodes))
+        if _HEADER.size + sum(count * struct.calcsize(code) for _, code, count in layout) + names_size > len(view):
+            raise ValueError("AST plano incompleto")
+
+        flat = cls.__new__(cls)
+        position = _HEADER.size
+        for name, code, count in layout:
+            size = count * struct.calcsize(code)
+            setattr(flat, name, view[position:position + size].cast(code))
+            position += size
+        names = bytes(view[position:position + names_size]).decode('utf-8')
+        flat.strings = names.split('\0') if string_count else []
+        return flat
+
+
+def flatten(ast):
+    """
+    Convierte la lista de sentencias de `parser` en un FlatAST.
+    """
+    flat = FlatAST()
+    kinds, sizes, values, floats, strings = flat.kinds, flat.sizes, flat.values, flat.floats, flat.strings
+    string_ids = {}
+
+    def string_id(name):
+        number = string_ids.get(name)
+        if number is None:
+            number = string_ids[name] = len(strings)
+            strings.append(name)
+        return number
+
+    def add(kind, value):
+        kinds.append(kind)
+        sizes.append(1)
+        values.append(value)
+        return len(kinds) - 1
+
+    # ('exit', número) marca el final del subárbol para calcular su tamaño
+    stack = [('node', statement) for statement in reversed(ast)]
+    while stack:
+        action, node = stack.pop()
+        if action == 'exit':
+            sizes[node] = len(kinds) - node
+            continue
+
+        if isinstance(node, tuple):
+            kind = node[0]
+            if kind == 'DECLARATION':
+                number = add(DECLARATION, string_id(node[1]))
+                children = node[2:]
+            elif kind == 'ASSIGNMENT':
+                number = add(ASSIGNMENT, 0)
+                children = node[1:]
+            elif kind == 'IF':
+                number = add(IF, len(node[2]))
+                children = (node[1], *node[2])
+            else:
+                number = add(kind_codes[kind], 0)
+                children = node[1:]
+            stack.append(('exit', number))
+            stack.extend(('node', child) for child in reversed(children))
+        elif isinstance(node, str):
+            add(NAME, string_id(node))
+        elif isinstance(node, float):
+            add(FLOAT, len(floats))
+            floats.append(node)
+        elif _INT32[0] <= node <= _INT32[1]:
+            add(INT, node)
+        else:
+            add(BIGINT, string_id(str(node)))
+    return flat
+
+
+def tree_bytes(ast):
+    """
+    Objetos distintos (por identidad) del AST de tuplas, incluidas las listas
+    de sentencias, y los bytes que ocupan.
+    """
+    seen = {id(ast)}
+    total = sys.getsizeof(ast)
+    stack = list(ast)
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        total += sys.getsizeof(node)
+        if isinstance(node, (tuple, list)):
+            stack.extend(node)
+    return len(seen), total
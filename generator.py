@@ -0,0 +1,104 @@
+import random
+
+# === GENERADOR DE PROGRAMAS SINTÉTICOS ===
+# Produce programas válidos para `lexer` y `parser` con una semilla fija, de modo
+# que la misma llamada genera siempre el mismo texto. Sirve para medir el
+# rendimiento con entradas de cualquier tamaño y forma.
+#
+# Parámetros de forma:
+# - statements: número de sentencias (contando las de dentro de los if).
+# - depth: profundidad máxima de las expresiones (0 = solo operandos).
+# - nesting: profundidad máxima de if anidados.
+# - comments: probabilidad de que una sentencia lleve un comentario.
+# - if_ratio: probabilidad de que una sentencia sea un if (si cabe otro nivel).
+
+OPERATORS = ('+', '-', '*', '/', '==')
+TYPES = ('int', 'float')
+COMMENTS = ('// actualiza el acumulador', '// caso general', '// TODO: revisar', '//')
+
+
+def _operand(rng, names):
+    choice = rng.random()
+    if choice < 0.5:
+        return rng.choice(names)
+    if choice < 0.8:
+        return str(rng.randint(0, 999))
+    return f'{rng.randint(0, 99)}.{rng.randint(0, 99)}'
+
+
+def generate_expression(rng, names, depth):
+    """
+    Genera el texto de una expresión de profundidad a lo sumo `depth`.
+    Es iterativa: cada hueco pendiente se expande o se cierra con un operando.
+    """
+    parts = []
+    stack = [depth]      # Profundidad restante de cada hueco; None escribe ')'
+    while stack:
+        remaining = stack.pop()
+        if remaining is None:
+            parts.append(')')
+        elif isinstance(remaining, str):
+            parts.append(remaining)
+        elif remaining <= 0 or rng.random() < 0.3:
+            parts.append(_operand(rng, names))
+        else:
+            parts.append('(')
+            stack.extend((None, remaining - 1, f' {rng.choice(OPERATORS)} ', remaining - 1))
+    return ''.join(parts)
+
+
+def generate_program(statements=1000, seed=0, depth=3, nesting=2, comments=0.1, if_ratio=0.15, names=None):
+    """
+    Genera el código fuente de un programa con `statements` sentencias.
+    """
+    rng = random.Random(seed)
+    names = names or [f'v{index}' for index in range(16)] + ['a', 'b', 'c', 'total', 'ratio']
+    lines = []
+    open_blocks = 0
+    for _ in range(statements):
+        # Cerrar bloques de vez en cuando
+        while open_blocks and rng.random() < 0.3:
+            open_blocks -= 1
+            lines.append('    ' * open_blocks + '}')
+        indent = '    ' * open_blocks
+
+        if rng.random() < comments:
+            lines.append(indent + rng.choice(COMMENTS))
+
+        choice = rng.random()
+        if open_blocks < nesting and choice < if_ratio:
+            condition = generate_expression(rng, names, max(depth - 1, 0))
+            lines.append(f'{indent}if ({condition}) {{')
+            open_blocks += 1
+            continue
+        expression = generate_expression(rng, names, depth)
+        if choice < if_ratio + 0.25:
+            if rng.random() < 0.1:
+                lines.append(f'{indent}{rng.choice(TYPES)} {rng.choice(names)};')
+            else:
+                lines.append(f'{indent}{rng.choice(TYPES)} {rng.choice(names)} = {expression};')
+        else:
+            statement = f'{indent}{rng.choice(names)} = {expression};'
+            if rng.random() < comments:
+                statement += ' ' + rng.choice(COMMENTS)
+            lines.append(statement)
+
+    # Cerrar los bloques que quedan abiertos (un if con el cuerpo vacío es válido)
+    while open_blocks:
+        open_blocks -= 1
+        lines.append('    ' * open_blocks + '}')
+    return '\n'.join(lines) + '\n'
+
+
+def count_statements(ast):
+    """
+    Cuenta las sentencias del AST, incluidas las de los cuerpos de los if.
+    """
+    total = 0
+    stack = list(ast)
+    while stack:
+        statement = stack.pop()
+        total += 1
+        if statement[0] == 'IF':
+            stack.extend(statement[2])
+    return total
@@ -0,0 +1,292 @@
+import argparse
+import ast as literals
+import json
+import os
+import pprint
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from incremental import check_random_edits
+from lexer import TypeView, lexer, lexer_backends
+from optimizer import check_random_programs
+from parser import parser
+from paths import expand_paths
+
+# === CORPUS DE CASOS DORADOS ===
+# Cada caso es un par de archivos con el mismo nombre en `corpus/`:
+# - nombre.src: el código fuente, tal cual (sin traducir los saltos de línea).
+# - nombre.golden: un diccionario literal de Python (se lee con
+#   `ast.literal_eval`, así se distinguen tuplas, listas, enteros y flotantes)
+#   con las claves:
+#     'description': texto del caso.
+#     'tokens': tokens esperados de `lexer`, con tipo de texto (opcional).
+#     'ast': AST esperado de `parser` (si no se espera un error).
+#     'error': {'type': ..., 'message': ...} del error esperado, léxico o sintáctico.
+#     'recover': True para analizar en el modo de recuperación (`lexer` y
+#       `parser` con `errors`; el lexer es siempre `lexer`, la única
+#       implementación que se recupera). 'ast' es entonces el AST parcial.
+#     'diagnostics': diagnósticos esperados del modo de recuperación, en orden.
+#     'budget_ms': tiempo máximo de lexer + parser para este caso (opcional).
+#
+# Uso:
+#   python golden.py [corpus|archivo.src ...] [-j N] [--budget MS] [--lexer NOMBRE] [--json salida] [--skip-checks] [-v]
+#   python golden.py --update [corpus|archivo.src ...]   (reescribe los .golden)
+# Después del corpus se ejecutan las verificaciones aleatorias de `checks`
+# (se omiten con --skip-checks).
+# Devuelve 0 si pasan todos los casos y verificaciones, 1 si alguno falla (o,
+# con --fail-slow, si algún caso supera su presupuesto de tiempo).
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+# Presupuesto de tiempo por caso (lexer + parser), en milisegundos
+BUDGET_MS = 50.0
+
+# Verificaciones aleatorias que acompañan al corpus: nombre -> función que
+# devuelve cuántas pruebas hizo o lanza AssertionError
+checks = {
+    'incremental': check_random_edits,
+    'optimizer': check_random_programs,
+}
+
+
+def golden_path(path):
+    return os.path.splitext(path)[0] + '.golden'
+
+
+def load_case(path):
+    """
+    Lee un caso a partir de la ruta de su .src. Devuelve un diccionario con
+    'name', 'path', 'source' y las claves de su .golden.
+    """
+    with open(path, encoding='utf-8', newline='') as file:
+        source_code = file.read()
+    case = {'name': os.path.splitext(os.path.relpath(path, CORPUS))[0], 'path': path, 'source': source_code}
+    if os.path.exists(golden_path(path)):
+        with open(golden_path(path), encoding='utf-8') as file:
+            case.update(literals.literal_eval(file.read()))
+    return case
+
+
+def load_corpus(paths=(CORPUS,)):
+    """
+    Casos de los .src de `paths` (ver `paths.expand_paths`), en orden.
+    """
+    return [load_case(path) for path in expand_paths(paths, '*.src')]
+
+
+def _first_difference(expected, obtained):
+    for index, (left, right) in enumerate(zip(expected, obtained)):
+        if left != right:
+            return f"en la posición {index}: se esperaba {left!r} y se obtuvo {right!r}"
+    return f"se esperaban {len(expected)} elementos y se obtuvieron {len(obtained)}"
+
+
+def _error(error):
+    return {'type': type(error).__name__, 'message': str(error)}
+
+
+def analyze_case(source_code, lex=lexer, parse=parser, repeat=1, recover=False):
+    """
+    Ejecuta lexer y parser sobre un texto `repeat` veces y devuelve
+    (tokens, ast, error, diagnósticos, mejor tiempo del lexer, mejor tiempo
+    del parser). Si hay un error, tokens o ast quedan en None según la fase que
+    falló. Los diagnósticos son la lista del modo de recuperación (con
+    `recover`) o None.
+    """
+    lex_time = parse_time = float('inf')
+    for _ in range(repeat):
+        tokens = ast = error = None
+        diagnostics = [] if recover else None
+        start = time.perf_counter()
+        try:
+            tokens = lex(source_code) if diagnostics is None else lexer(source_code, errors=diagnostics)
+        except SyntaxError as exception:
+            error = _error(exception)
+        lex_time = min(lex_time, time.perf_counter() - start)
+        if tokens is None:
+            parse_time = 0.0
+            continue
+        start = time.perf_counter()
+        try:
+            ast = parse(tokens) if diagnostics is None else parse(tokens, errors=diagnostics)
+        except SyntaxError as exception:
+            error = _error(exception)
+        parse_time = min(parse_time, time.perf_counter() - start)
+    return tokens, ast, error, diagnostics, lex_time, parse_time
+
+
+def check_case(case, budget_ms=BUDGET_MS, repeat=1, lex=lexer, parse=parser):
+    """
+    Ejecuta un caso y lo compara con lo esperado. Devuelve un diccionario con
+    'name', 'passed', 'failures' (lista de textos), 'lex_ms', 'parse_ms',
+    'budget_ms' y 'slow'.
+    """
+    tokens, ast, error, diagnostics, lex_time, parse_time = analyze_case(
+        case['source'], lex, parse, repeat, case.get('recover', False))
+    failures = []
+
+    if 'tokens' in case and tokens is not None and TypeView(tokens) != case['tokens']:
+        failures.append("tokens distintos " + _first_difference(case['tokens'], TypeView(tokens)))
+    if 'error' in case:
+        if error is None:
+            failures.append(f"se esperaba {case['error']['type']}: {case['error']['message']}")
+        elif error != case['error']:
+            failures.append(f"error distinto: se esperaba {case['error']['type']}: {case['error']['message']}; "
+                            f"se obtuvo {error['type']}: {error['message']}")
+    elif error is not None:
+        failures.append(f"error inesperado {error['type']}: {error['message']}")
+    elif 'ast' in case and ast != case['ast']:
+        failures.append("AST distinto " + _first_difference(case['ast'], ast))
+    if 'diagnostics' in case and diagnostics != case['diagnostics']:
+        failures.append("diagnósticos distintos " + _first_difference(case['diagnostics'], diagnostics or []))
+
+    budget_ms = case.get('budget_ms', budget_ms)
+    elapsed_ms = (lex_time + parse_time) * 1000
+    return {
+        'name': case['name'],
+        'passed': not failures,
+        'failures': failures,
+        'lex_ms': lex_time * 1000,
+        'parse_ms': parse_time * 1000,
+        'budget_ms': budget_ms,
+        'slow': elapsed_ms > budget_ms,
+    }
+
+
+def _warm_up(backend):
+    # Prepara la implementación antes de medir (el backend numpy importa NumPy al usarse)
+    lexer_backends[backend]('')
+
+
+def _check_path(item):
+    path, budget_ms, repeat, backend = item
+    return check_case(load_case(path), budget_ms, repeat, lexer_backends[backend])
+
+
+def run(paths=(CORPUS,), workers=None, chunksize=8, budget_ms=BUDGET_MS, repeat=1, backend='regex'):
+    """
+    Ejecuta los casos de `paths` en un grupo de procesos (en este proceso si
+    `workers` es 1) con la implementación `backend` de `lexer_backends`.
+    Devuelve el resumen: totales y el resultado de cada caso en el orden del corpus.
+    """
+    items = [(path, budget_ms, repeat, backend) for path in expand_paths(paths, '*.src')]
+    start = time.perf_counter()
+    if workers == 1:
+        _warm_up(backend)
+        results = list(map(_check_path, items))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up, initargs=(backend,)) as executor:
+            results = list(executor.map(_check_path, items, chunksize=chunksize))
+
+    return {
+        'cases': len(results),
+        'passed': sum(result['passed'] for result in results),
+        'failed': sum(not result['passed'] for result in results),
+        'slow': sum(result['slow'] for result in results),
+        'lex_ms': sum(result['lex_ms'] for result in results),
+        'parse_ms': sum(result['parse_ms'] for result in results),
+        'seconds': time.perf_counter() - start,
+        'results': results,
+    }
+
+
+def run_checks(names=None):
+    """
+    Ejecuta las verificaciones de `checks` (todas si `names` es None).
+    Devuelve {nombre: {'passed': ..., 'count': ..., 'message': ...}}.
+    """
+    results = {}
+    for name in checks if names is None else names:
+        try:
+            results[name] = {'passed': True, 'count': checks[name](), 'message': None}
+        except AssertionError as error:
+            results[name] = {'passed': False, 'count': 0, 'message': str(error)}
+    return results
+
+
+def update_case(path, lex=lexer, parse=parser):
+    """
+    Reescribe el .golden de un caso con la salida actual de lexer y parser,
+    conservando la descripción y el presupuesto.
+    """
+    case = load_case(path)
+    tokens, ast, error, diagnostics, _, _ = analyze_case(case['source'], lex, parse, recover=case.get('recover', False))
+    golden = {'description': case.get('description', case['name'])}
+    if 'budget_ms' in case:
+        golden['budget_ms'] = case['budget_ms']
+    if diagnostics is not None:
+        golden['recover'] = True
+    if tokens is not None:
+        golden['tokens'] = list(TypeView(tokens))
+    if error is not None:
+        golden['error'] = error
+    else:
+        golden['ast'] = ast
+    if diagnostics is not None:
+        golden['diagnostics'] = diagnostics
+    with open(golden_path(path), 'w', encoding='utf-8') as file:
+        file.write(pprint.pformat(golden, width=100, sort_dicts=False) + '\n')
+    return golden
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(prog='golden', description='Ejecuta el corpus de casos dorados.')
+    arguments.add_argument('paths', nargs='*', default=[CORPUS], help='directorios, archivos .src o patrones glob')
+    arguments.add_argument('-j', '--workers', type=int, default=None,
+                           help='número de procesos (por defecto, uno por CPU)')
+    arguments.add_argument('--budget', type=float, default=BUDGET_MS,
+                           help='tiempo máximo por caso en ms (lexer + parser)')
+    arguments.add_argument('--lexer', choices=list(lexer_backends), default='regex',
+                           help='implementación del analizador léxico')
+    arguments.add_argument('--repeat', type=int, default=1, help='ejecuciones por caso (se toma la mejor)')
+    arguments.add_argument('--json', metavar='ARCHIVO', help="guarda el resumen en JSON ('-' para la salida estándar)")
+    arguments.add_argument('--fail-slow', action='store_true', help='los casos lentos también fallan')
+    arguments.add_argument('--update', action='store_true', help='reescribe los .golden con la salida actual')
+    arguments.add_argument('--skip-checks', action='store_true', help='no ejecuta las verificaciones aleatorias')
+    arguments.add_argument('-v', '--verbose', action='store_true', help='muestra todos los casos')
+    options = arguments.parse_args(argv)
+
+    if options.update:
+        paths = list(expand_paths(options.paths, '*.src'))
+        for path in paths:
+            update_case(path)
+        print(f"{len(paths)} casos actualizados", file=sys.stderr)
+        return 0
+
+    summary = run(options.paths, options.workers, budget_ms=options.budget, repeat=options.repeat,
+                  backend=options.lexer)
+    report = sys.stderr if options.json == '-' else sys.stdout
+    for result in summary['results']:
+        if result['passed'] and not result['slow'] and not options.verbose:
+            continue
+        status = 'ok' if result['passed'] else 'FALLA'
+        if result['slow']:
+            status += f" LENTO (presupuesto {result['budget_ms']:g} ms)"
+        print(f"{result['name']}: {status} [lexer {result['lex_ms']:.2f} ms, parser {result['parse_ms']:.2f} ms]",
+              file=report)
+        for failure in result['failures']:
+            print(f"    {failure}", file=report)
+
+    summary['checks'] = {} if options.skip_checks else run_checks()
+    for name, result in summary['checks'].items():
+        if result['passed']:
+            print(f"{name}: {result['count']} pruebas aleatorias verificadas", file=sys.stderr)
+        else:
+            print(f"{name}: FALLA\n    {result['message']}", file=report)
+
+    if options.json == '-':
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif options.json:
+        with open(options.json, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+    print(f"{summary['cases']} casos: {summary['passed']} correctos, {summary['failed']} fallidos, "
+          f"{summary['slow']} lentos en {summary['seconds']:.2f} s "
+          f"(lexer {summary['lex_ms']:.1f} ms, parser {summary['parse_ms']:.1f} ms)", file=sys.stderr)
+    failed_checks = not all(result['passed'] for result in summary['checks'].values())
+    return 1 if summary['failed'] or failed_checks or (options.fail_slow and summary['slow']) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+import random
+from bisect import bisect_right
+from operator import attrgetter
+
+from lexer import lexer, lex_spans
+from parser import IterTokenStream, parse_statement, parser
+
+# === ANÁLISIS INCREMENTAL ===
+# La fuente se divide en regiones consecutivas, una por sentencia de nivel
+# superior. Cada región empieza donde termina la anterior (incluye los espacios
+# y comentarios previos) y termina justo después del ';' o '}' que cierra la
+# sentencia. Como esos tokens son de un solo carácter, el análisis léxico puede
+# reanudarse justo después de ellos sin depender del texto anterior.
+#
+# Una edición desplaza todas las sentencias posteriores. Para no recorrerlas,
+# la sesión lleva un único desplazamiento pendiente (posiciones y líneas) que se
+# aplica a las sentencias desde el índice `_tail`; cada edición solo ajusta
+# las sentencias entre ella y la edición anterior, y la sentencia afectada se
+# busca con una búsqueda binaria.
+
+_end = attrgetter('end')
+
+
+class Statement:
+    """
+    Región de la fuente ocupada por una sentencia de nivel superior.
+    Las líneas de los tokens se guardan relativas a `line` para que desplazar
+    la región tras una edición no obligue a reconstruir sus tokens. En una
+    sesión, `start`, `end` y `line` no incluyen el desplazamiento pendiente
+    (ver `IncrementalSession.region`).
+    """
+
+    __slots__ = ('start', 'end', 'line', 'newlines', 'tokens', 'node')
+
+    def __init__(self, start, end, line, newlines, tokens, node):
+        self.start = start          # Posición donde empieza la región
+        self.end = end              # Posición justo después del token final
+        self.line = line            # Línea en la que empieza la región
+        self.newlines = newlines    # Saltos de línea dentro de la región
+        self.tokens = tokens        # Tokens (clase, valor, línea relativa)
+        self.node = node            # Nodo del AST de la sentencia
+
+
+class IncrementalSession:
+    """
+    Sesión de análisis para un texto que se edita repetidamente.
+    Conserva los tokens y el AST de cada sentencia con su ubicación y, ante una
+    edición, solo vuelve a analizar las sentencias afectadas.
+    """
+
+    def __init__(self, source_code):
+        self.source = source_code
+        self.statements = None      # None si el último análisis falló
+        self._nodes = None          # Nodo de cada sentencia, en el mismo orden
+        self._tail = 0              # Primera sentencia con el desplazamiento pendiente
+        self._delta = 0             # Desplazamiento pendiente de las posiciones
+        self._line_delta = 0        # Desplazamiento pendiente de las líneas
+        self._rebuild()
+
+    @property
+    def ast(self):
+        """
+        AST completo, igual al que produciría parser(lexer(source)).
+        """
+        if self.statements is None:
+            self._rebuild()
+        return list(self._nodes)
+
+    @property
+    def tokens(self):
+        """
+        Lista completa de tokens, igual a la que produciría lexer(source).
+        """
+        if self.statements is None:
+            self._rebuild()
+        tokens = []
+        for index, statement in enumerate(self.statements):
+            base = self.region(index)[2]
+            tokens.extend((tk_type, tk_val, base + line) for tk_type, tk_val, line in statement.tokens)
+        return tokens
+
+    def region(self, index):
+        """
+        (inicio, fin, línea) de la sentencia número `index` en la fuente actual.
+        """
+        statement = self.statements[index]
+        if index < self._tail:
+            return statement.start, statement.end, statement.line
+        return statement.start + self._delta, statement.end + self._delta, statement.line + self._line_delta
+
+    def edit(self, offset, removed, inserted):
+        """
+        Aplica una edición: elimina `removed` caracteres desde `offset` e inserta
+        el texto `inserted`. Devuelve (ast, nodos_cambiados), donde nodos_cambiados
+        son las sentencias que se volvieron a analizar.
+        """
+        if offset < 0 or removed < 0 or offset + removed > len(self.source):
+            raise ValueError("Edición fuera de los límites de la fuente.")
+
+        self.source = self.source[:offset] + inserted + self.source[offset + removed:]
+
+        # Si el estado anterior no era válido no hay nada que reutilizar
+        if self.statements is None:
+            self._rebuild()
+            return self.ast, self.ast
+
+        try:
+            changed = self._reparse(offset, removed, len(inserted))
+        except SyntaxError:
+            self.statements = None
+            raise
+        return self.ast, changed
+
+    def _rebuild(self):
+        """
+        Analiza toda la fuente desde el principio.
+        """
+        self.statements = None
+        statements, _ = self._parse_from(0, 1, None)
+        self.statements = statements
+        self._nodes = [statement.node for statement in statements]
+        self._tail, self._delta, self._line_delta = len(statements), 0, 0
+
+    def _shift(self, start, stop, delta, line_delta):
+        # Suma los desplazamientos a las sentencias de `start` a `stop`
+        for statement in self.statements[start:stop]:
+            statement.start += delta
+            statement.end += delta
+            statement.line += line_delta
+
+    def _reparse(self, offset, removed, inserted):
+        """
+        Vuelve a analizar desde la primera sentencia afectada por la edición hasta
+        que una sentencia nueva termina en el mismo punto que una anterior.
+        """
+        old = self.statements
+        delta = inserted - removed
+
+        # Primera sentencia cuya región llega hasta la posición editada; las
+        # sentencias desde `_tail` guardan el fin sin el desplazamiento pendiente
+        first = bisect_right(old, offset, hi=self._tail, key=_end)
+        if first == self._tail:
+            first = bisect_right(old, offset - self._delta, lo=self._tail, key=_end)
+            # Las sentencias entre la edición anterior y esta reciben su desplazamiento
+            self._shift(self._tail, first, self._delta, self._line_delta)
+            self._tail = first
+
+        if first:
+            previous = old[first - 1]
+            start, line = previous.end, previous.line + previous.newlines
+        else:
+            start, line = 0, 1
+
+        # La sincronización solo es posible después del texto insertado
+        sync = (offset + inserted, delta, first)
+        new, resume = self._parse_from(start, line, sync)
+
+        if resume is None:
+            old[first:] = new
+            self._nodes[first:] = [statement.node for statement in new]
+            self._tail, self._delta, self._line_delta = len(old), 0, 0
+        else:
+            # Las sentencias posteriores se conservan y el desplazamiento de esta
+            # edición se suma al pendiente; las que aún no lo tenían lo pierden
+            last_new = new[-1]
+            _, _, sync_line = self.region(resume)
+            line_delta = (last_new.line + last_new.newlines) - (sync_line + old[resume].newlines)
+            self._shift(resume + 1, self._tail, -self._delta, -self._line_delta)
+            old[first:resume + 1] = new
+            self._nodes[first:resume + 1] = [statement.node for statement in new]
+            self._tail = first + len(new)
+            self._delta += delta
+            self._line_delta += line_delta
+
+        return [statement.node for statement in new]
+
+    def _parse_from(self, start, line, sync):
+        """
+        Analiza sentencias desde `start` (con línea `line`).
+        Si `sync` es (fin_edición, delta, desde), se detiene en cuanto una sentencia
+        nueva termina donde terminaba una de las sentencias actuales de la sesión
+        (a partir del índice `desde`), y devuelve el índice de esa sentencia; si no,
+        analiza hasta el final.
+        """
+        source = self.source
+        pending = []              # Tokens leídos del lexer y aún no asignados a una sentencia
+
+        def token_source():
+            for tk_type, tk_val, tk_line, _, tk_end in lex_spans(source, start, line):
+                pending.append((tk_type, tk_val, tk_line, tk_end))
+                yield (tk_type, tk_val, tk_line)
+
+        tokens = IterTokenStream(token_source())
+        statements = []
+        consumed = 0
+        region_start, region_line = start, line
+
+        if sync is not None:
+            edit_end, delta, index = sync
+            known = len(self.statements)
+
+        while tokens:
+            node = parse_statement(tokens)
+
+            # Tokens de esta sentencia: los consumidos desde la anterior
+            count = tokens.index - consumed
+            consumed = tokens.index
+            own, pending[:count] = pending[:count], []
+            end = own[-1][3]
+
+            newlines = source.count('\n', region_start, end)
+            statements.append(Statement(
+                region_start, end, region_line, newlines,
+                [(tk_type, tk_val, tk_line - region_line) for tk_type, tk_val, tk_line, _ in own],
+                node,
+            ))
+            region_start, region_line = end, region_line + newlines
+
+            if sync is not None and end >= edit_end:
+                old_end = end - delta
+                while index < known and self.region(index)[1] < old_end:
+                    index += 1
+                if index < known and self.region(index)[1] == old_end:
+                    return statements, index
+
+        return statements, None
+
+
+# === VERIFICACIÓN ===
+# Fragmentos con los que se generan programas y ediciones aleatorias
+_FRAGMENTS = [
+    'int ', 'float ', 'if ', 'a', 'b', 'x1', ' = ', '==', ' + ', ' - ', ' * ', ' / ',
+    '(', ')', '{', '}', '; ', ';\n', '1', '2.5', '.', '\n', '  ', '// nota\n', '//',
+]
+_STATEMENTS = [
+    'int a = 1;\n', 'float b = 2.5;\n', 'x1 = (a + b) * 2;\n',
+    'if (a == b) {\n  a = a - 1;\n}\n', 'b = b / 4; // fin\n',
+    'if (x1) { if (a) { b = 3; } }\n',
+]
+
+
+def _full_run(source_code):
+    """
+    Resultado de analizar la fuente completa, o None si hay error de sintaxis.
+    """
+    try:
+        tokens = lexer(source_code)
+        return tokens, parser(tokens)
+    except SyntaxError:
+        return None
+
+
+def check_random_edits(seed=0, edits=2000):
+    """
+    Aplica ediciones aleatorias a una sesión y compara tras cada una el resultado
+    incremental con un análisis completo. Devuelve el número de ediciones probadas.
+    """
+    rng = random.Random(seed)
+    session = IncrementalSession(''.join(rng.choice(_STATEMENTS) for _ in range(20)))
+
+    for _ in range(edits):
+        source = session.source
+        if session.statements and rng.random() < 0.5:
+            # Edición que mantiene el programa válido: insertar o borrar una sentencia completa
+            start, end, _ = session.region(rng.randrange(len(session.statements)))
+            if rng.random() < 0.5:
+                offset, removed, inserted = end, 0, rng.choice(_STATEMENTS)
+            else:
+                offset, removed, inserted = start, end - start, ''
+        else:
+            offset = rng.randint(0, len(source))
+            removed = rng.randint(0, min(8, len(source) - offset))
+            inserted = ''.join(rng.choice(_FRAGMENTS + _STATEMENTS) for _ in range(rng.randint(0, 3)))
+
+        expected_source = source[:offset] + inserted + source[offset + removed:]
+        expected = _full_run(expected_source)
+        try:
+            ast, _ = session.edit(offset, removed, inserted)
+            result = (session.tokens, ast)
+        except SyntaxError:
+            result = None
+
+        if result != expected:
+            raise AssertionError(f"Resultado incremental distinto tras editar {expected_source!r}")
+
+        # Las regiones, con el desplazamiento pendiente, deben cubrir la fuente en orden
+        position = 0
+        for index in range(len(session.statements) if result is not None else 0):
+            start, end, line = session.region(index)
+            if start != position or line != expected_source.count('\n', 0, start) + 1:
+                raise AssertionError(f"Región {index} desplazada tras editar {expected_source!r}")
+            position = end
+
+        # Cada tanto se vuelve a un programa válido para no quedarse en estado de error
+        if result is None and rng.random() < 0.3:
+            session = IncrementalSession(''.join(rng.choice(_STATEMENTS) for _ in range(20)))
+
+    return edits
+
+
+if __name__ == "__main__":
+    print(f"{check_random_edits()} ediciones aleatorias verificadas ✔️")
@@ -0,0 +1,108 @@
+import sys
+
+from parser import parser
+
+# === EXPRESIONES COMPARTIDAS (HASH-CONSING) ===
+# Con un Interner, el parser construye cada expresión distinta una sola vez:
+# dos subexpresiones iguales son el mismo objeto y cada nodo recibe un
+# identificador entero estable (en orden de aparición). Los nodos siguen siendo
+# las mismas tuplas de siempre, así que el AST compara igual que el árbol normal.
+
+
+class Interner:
+    """
+    Tabla de nodos únicos de expresión.
+    Como los hijos ya son únicos, la clave de un nodo usa la identidad de sus
+    hijos y se calcula en tiempo constante, sin recorrer el subárbol.
+    """
+
+    def __init__(self):
+        self.table = {}     # Clave -> nodo único
+        self.ids = {}       # id(nodo único) -> identificador entero
+        self.nodes = []     # Identificador -> nodo (mantiene vivos los nodos)
+
+    def _register(self, key, node):
+        self.table[key] = node
+        self.ids[id(node)] = len(self.nodes)
+        self.nodes.append(node)
+        return node
+
+    def leaf(self, value):
+        """
+        Devuelve la constante o el nombre de variable único igual a `value`.
+        """
+        # El tipo forma parte de la clave para no confundir 1 con 1.0
+        key = (type(value), value)
+        node = self.table.get(key)
+        return node if node is not None else self._register(key, value)
+
+    def node(self, op, left, right):
+        """
+        Devuelve el nodo único (op, left, right); `left` y `right` deben ser únicos.
+        """
+        key = (op, id(left), id(right))
+        node = self.table.get(key)
+        return node if node is not None else self._register(key, (op, left, right))
+
+    def node_id(self, node):
+        """
+        Identificador entero de un nodo único.
+        """
+        return self.ids[id(node)]
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+def _object_bytes(ast):
+    """
+    Cuenta los objetos distintos (por identidad) que forman las expresiones
+    del AST y los bytes que ocupan. Los objetos compartidos se cuentan una vez.
+    """
+    seen = set()
+    total = 0
+    stack = list(ast)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        total += sys.getsizeof(node)
+        if isinstance(node, tuple):
+            stack.extend(node)
+    return len(seen), total
+
+
+def memory_report(tokens):
+    """
+    Analiza los tokens como árbol y como grafo compartido y compara su memoria.
+    """
+    tree = parser(tokens)
+    interner = Interner()
+    dag = parser(tokens, interner)
+    if dag != tree:
+        raise AssertionError("El AST compartido no coincide con el árbol")
+
+    tree_objects, tree_bytes = _object_bytes(tree)
+    dag_objects, dag_bytes = _object_bytes(dag)
+    return {
+        'tree_objects': tree_objects,
+        'tree_bytes': tree_bytes,
+        'dag_objects': dag_objects,
+        'dag_bytes': dag_bytes,
+        'unique_nodes': len(interner),
+        'ratio': tree_bytes / dag_bytes if dag_bytes else 1.0,
+    }
+
+
+if __name__ == "__main__":
+    from lexer import lexer
+
+    # Uso: python interning.py archivo
+    with open(sys.argv[1], encoding='utf-8') as file:
+        report = memory_report(lexer(file.read()))
+    for name, value in report.items():
+        print(f"{name}: {value:,.2f}" if isinstance(value, float) else f"{name}: {value:,}")
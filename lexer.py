@@ -1,3 +1,5 @@
+import codecs
+import mmap
 import re
 
 # === DEFINICIÓN DE TOKENS ===
@@ -15,10 +17,224 @@ token_definitions = [
     ('WHITESPACE', r'\s+'),             # Token para espacios en blanco, tabulaciones y saltos de línea
 ]
 
-def lexer(source_code):
+class LexerError(SyntaxError):
+    """
+    Error léxico: texto que no corresponde a ningún token.
+    Guarda la posición absoluta del error en `position`.
+    """
+
+    def __init__(self, position):
+        super().__init__(f"Token no reconocido en la posición {position}")
+        self.position = position
+
+    def __reduce__(self):
+        # Permite enviar el error entre procesos conservando la posición
+        return (type(self), (self.position,))
+
+
+# === MOTOR DE ESCANEO ===
+# Una sola expresión regular con un grupo nombrado por cada token, compilada una
+# vez al importar el módulo. La alternancia de `re` prueba las opciones en orden,
+# así que se conserva la misma prioridad que tiene `token_definitions`.
+token_regex = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_definitions))
+
+
+# === CLASES DE TOKEN ===
+# Los tokens son (clase, valor, línea), donde la clase es un entero pequeño que
+# afina el tipo de `token_definitions`: cada palabra clave (int, float, if) y
+# cada operador o signo tiene la suya. El lexer la asigna una sola vez, con un
+# diccionario, y el parser decide con comparaciones de enteros o índices en
+# tablas en lugar de comparar el tipo y luego el valor.
+#
+# `kind_values` solo enumera valores: el tipo de cada clase se obtiene al
+# importar el módulo reconociendo el valor con `token_regex`, y cada tipo de
+# `token_definitions` sin clase propia recibe una genérica, así que la tabla no
+# puede contradecir a las definiciones (un operador nuevo, por ejemplo, llega
+# al parser con la clase genérica de OPERATOR). `TypeView` presenta una lista
+# de tokens con el tipo de texto de siempre.
+
+(NUMBER, IDENTIFIER, KW_INT, KW_FLOAT, KW_IF, ASSIGN, PLUS, MINUS, TIMES, DIVIDE, EQUALS,
+ LPAREN, RPAREN, LBRACE, RBRACE, SEMICOLON) = range(16)
+
+# Valor -> clase de las palabras clave y de los signos
+kind_values = {
+    'int': KW_INT, 'float': KW_FLOAT, 'if': KW_IF,
+    '=': ASSIGN, '+': PLUS, '-': MINUS, '*': TIMES, '/': DIVIDE, '==': EQUALS,
+    '(': LPAREN, ')': RPAREN, '{': LBRACE, '}': RBRACE, ';': SEMICOLON,
+}
+
+# Tipo -> clase de los valores que no están en `kind_values`
+type_kinds = {'NUMBER': NUMBER, 'IDENTIFIER': IDENTIFIER}
+
+# Clases que pueden usarse como nombre de variable (las palabras clave también)
+name_kinds = frozenset((IDENTIFIER, KW_INT, KW_FLOAT, KW_IF))
+
+# Tipo de texto de cada clase
+kind_types = [None] * (SEMICOLON + 1)
+for _type, _kind in type_kinds.items():
+    kind_types[_kind] = _type
+for _value, _kind in kind_values.items():
+    _match = token_regex.fullmatch(_value)
+    if _match is None or _match.lastgroup in ('WHITESPACE', 'COMMENT'):
+        raise ValueError(f"{_value!r} no es un token de token_definitions")
+    kind_types[_kind] = _match.lastgroup
+for _type, _ in token_definitions:
+    if _type not in type_kinds and _type not in ('WHITESPACE', 'COMMENT'):
+        type_kinds[_type] = len(kind_types)
+        kind_types.append(_type)
+
+
+def kind_of(token_type, value):
+    """
+    Clase de un token a partir de su tipo de texto y su valor.
+    """
+    return kind_values.get(value, type_kinds[token_type])
+
+
+def as_kinds(tokens):
+    """
+    Convierte tokens con tipo de texto (tipo, valor, línea) en tokens con
+    clase. Los que ya tienen clase se devuelven tal cual, sin copiarlos.
+    """
+    if not tokens or not isinstance(tokens[0][0], str):
+        return tokens
+    return [(kind_of(token_type, value), value, line) for token_type, value, line in tokens]
+
+
+def as_type(token):
+    """
+    Token con tipo de texto a partir de uno con clase.
+    """
+    return (kind_types[token[0]], token[1], token[2])
+
+
+class TypeView:
+    """
+    Vista de compatibilidad: presenta una lista de tokens con clase como la
+    lista de tuplas (tipo, valor, línea) de texto, sin copiarla.
+    """
+
+    __slots__ = ('tokens',)
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [as_type(token) for token in self.tokens[index]]
+        return as_type(self.tokens[index])
+
+    def __iter__(self):
+        types = kind_types
+        for kind, value, line in self.tokens:
+            yield (types[kind], value, line)
+
+    def __eq__(self, other):
+        if isinstance(other, (TypeView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def lexer(source_code, line_number=1, errors=None):
     """
     Analizador léxico que recibe el código fuente como texto y devuelve
-    una lista de tokens reconocidos en el código.
+    una lista de tokens (clase, valor, línea) reconocidos en el código.
+    Recorre el texto en una sola pasada con la expresión maestra `token_regex`.
+    `line_number` es la línea del primer carácter (útil al analizar un fragmento).
+    Si se pasa una lista `errors`, el texto no reconocido no detiene el análisis:
+    se salta y se añade a la lista un diagnóstico (ver `lexical_diagnostic`).
+    """
+    position = 0              # Posición donde debe empezar el siguiente token
+    found_tokens = []         # Lista donde se almacenarán los tokens válidos
+    append = found_tokens.append
+    value_kind = kind_values.get
+    kinds = type_kinds
+
+    for match in token_regex.finditer(source_code):
+        # Si la coincidencia no empieza donde terminó la anterior, hay texto sin reconocer
+        if match.start() != position:
+            if errors is None:
+                raise LexerError(position)
+            errors.append(lexical_diagnostic(source_code, position, match.start(), line_number))
+
+        token_type = match.lastgroup     # Nombre del grupo que coincidió
+        token_value = match.group()
+
+        # aumentar la linea dependiendo del numero de saltos
+        if token_type == 'WHITESPACE':
+            line_number += token_value.count('\n')
+        # El resto, salvo los comentarios, se añade a la lista con su clase; los
+        # tipos más frecuentes se tratan aparte para no buscar más de lo necesario
+        elif token_type == 'IDENTIFIER':
+            append((value_kind(token_value, IDENTIFIER), token_value, line_number))
+        elif token_type == 'NUMBER':
+            append((NUMBER, token_value, line_number))
+        elif token_type != 'COMMENT':
+            append((value_kind(token_value, kinds[token_type]), token_value, line_number))
+
+        position = match.end()
+
+    # Texto sin reconocer al final de la fuente
+    if position < len(source_code):
+        if errors is None:
+            raise LexerError(position)
+        errors.append(lexical_diagnostic(source_code, position, len(source_code), line_number))
+
+    return found_tokens
+
+
+def lexical_diagnostic(source_code, start, end, line_number):
+    """
+    Diagnóstico de un tramo de texto no reconocido. El tramo nunca contiene
+    saltos de línea (los reconoce WHITESPACE), así que está en `line_number`.
+    La columna (desde 1) se calcula solo aquí, en el camino de error.
+    """
+    return {
+        'kind': 'lexical',
+        'line': line_number,
+        'column': start - source_code.rfind('\n', 0, start),
+        'position': start,
+        'text': source_code[start:end],
+        'message': str(LexerError(start)),
+    }
+
+
+def lex_offsets(source_code):
+    """
+    Variante de `lexer` que guarda en cada token su posición inicial en lugar
+    de la línea: (clase, valor, inicio); el final es inicio + len(valor). No
+    cuenta saltos de línea; la línea y la columna se calculan cuando hacen
+    falta con `positions.SourceIndex`.
+    """
+    position = 0
+    found_tokens = []
+    append = found_tokens.append
+
+    for match in token_regex.finditer(source_code):
+        if match.start() != position:
+            raise LexerError(position)
+        token_type = match.lastgroup
+        if token_type != 'WHITESPACE' and token_type != 'COMMENT':
+            token_value = match.group()
+            append((kind_of(token_type, token_value), token_value, position))
+        position = match.end()
+
+    if position < len(source_code):
+        raise LexerError(position)
+    return found_tokens
+
+
+def lexer_reference(source_code):
+    """
+    Implementación original del analizador léxico, conservada como referencia.
+    Prueba cada patrón de `token_definitions` en orden en cada posición; es más
+    lenta que `lexer` pero sirve para comprobar que ambas producen lo mismo.
     """
     position = 0              # Posición actual dentro del texto fuente
     line_number = 1             # Contador de linea inicia en 1
@@ -42,8 +258,8 @@ def lexer(source_code):
 
                 # Ignorar los tokens de espacio en blanco y comentarios
                 if token_type not in ('WHITESPACE', 'COMMENT'):
-                    # Añade el token (tipo, valor) a la lista de tokens encontrados
-                    found_tokens.append((token_type, token_value, line_number))
+                    # Añade el token (clase, valor, línea) a la lista de tokens encontrados
+                    found_tokens.append((kind_of(token_type, token_value), token_value, line_number))
 
                 # Avanza la posición hasta el final del texto que coincidió
                 position = match.end()
@@ -51,7 +267,166 @@ def lexer(source_code):
 
         # Si no se encontró ningún token válido en la posición actual, hay un error
         if not match:
-            raise SyntaxError(f"Token no reconocido en la posición {position}")
+            raise LexerError(position)
 
     # Retorna la lista completa de tokens válidos encontrados en el código fuente
-    return found_tokens
\ No newline at end of file
+    return found_tokens
+
+
+def lex_spans(source_code, position=0, line_number=1):
+    """
+    Generador de tokens con su ubicación: (clase, valor, línea, inicio, fin).
+    Empieza en `position`, que debe ser el comienzo de un token, contando las
+    líneas desde `line_number`. Se usa para volver a analizar solo una parte
+    de una fuente ya conocida.
+    """
+    for match in token_regex.finditer(source_code, position):
+        if match.start() != position:
+            raise LexerError(position)
+
+        token_type = match.lastgroup
+        end = match.end()
+        if token_type == 'WHITESPACE':
+            line_number += source_code.count('\n', position, end)
+        elif token_type != 'COMMENT':
+            token_value = match.group()
+            yield (kind_of(token_type, token_value), token_value, line_number, position, end)
+        position = end
+
+    if position < len(source_code):
+        raise LexerError(position)
+
+
+# === LECTURA POR BLOQUES ===
+# Tamaño por defecto de cada bloque leído del archivo (en caracteres o bytes)
+CHUNK_SIZE = 1 << 16
+
+# Caracteres que deben existir después de un token para dar por hecho que
+# terminó: '1.' necesita ver un dígito más para saber si es un decimal, y
+# '=' o '/' necesitan ver el siguiente para distinguir '==' y '//'.
+LOOKAHEAD = 2
+
+
+def lex_stream(fileobj, chunk_size=CHUNK_SIZE, encoding='utf-8'):
+    """
+    Analizador léxico incremental sobre un objeto con método read().
+    Lee el texto en bloques de tamaño fijo y produce los mismos tokens que
+    `lexer`, uno a uno, sin cargar nunca la fuente completa en memoria.
+    Acepta archivos en modo texto o binario (se decodifica con `encoding`).
+    """
+    decoder = None            # Decodificador incremental, solo para entradas binarias
+    buffer = ''               # Texto leído y aún no consumido
+    base = 0                  # Posición absoluta del inicio de `buffer`
+    position = 0              # Posición dentro de `buffer`
+    wanted = 0                # Texto sin consumir necesario para volver a analizar
+    line_number = 1
+    eof = False
+
+    while True:
+        # Se descarta lo ya consumido y se leen bloques hasta tener `wanted`
+        # caracteres; se unen una sola vez
+        base += position
+        chunks = [buffer[position:]]
+        size = len(chunks[0])
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if isinstance(chunk, (bytes, bytearray)):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(encoding)()
+                eof = not chunk
+                chunk = decoder.decode(chunk, final=eof)
+            else:
+                eof = not chunk
+            chunks.append(chunk)
+            size += len(chunk)
+            if eof or size >= wanted:
+                break
+        buffer = ''.join(chunks)
+        position = 0
+
+        # Un token que termina demasiado cerca del final del bloque podría
+        # continuar en el siguiente, así que se espera a tener más texto
+        limit = len(buffer) if eof else len(buffer) - LOOKAHEAD
+
+        while position < len(buffer):
+            match = token_regex.match(buffer, position)
+            if match is None:
+                raise LexerError(base + position)
+
+            end = match.end()
+            if end > limit:
+                break
+
+            token_type = match.lastgroup
+            if token_type == 'WHITESPACE':
+                line_number += buffer.count('\n', position, end)
+            elif token_type != 'COMMENT':
+                token_value = match.group()
+                yield (kind_of(token_type, token_value), token_value, line_number)
+            position = end
+
+        if eof:
+            return
+        # Un token sin terminar se vuelve a analizar desde su inicio: con el doble
+        # de texto en cada intento, un token más largo que varios bloques se
+        # analiza O(log n) veces en lugar de una vez por bloque
+        wanted = 2 * (len(buffer) - position)
+
+
+class _MmapReader:
+    """
+    Lector secuencial sobre un mmap que libera las páginas ya leídas,
+    para que la memoria residente no crezca con el tamaño del archivo.
+    """
+
+    def __init__(self, mapped):
+        self.mapped = mapped
+        self.offset = 0       # Siguiente byte a leer
+        self.released = 0     # Bytes ya devueltos al sistema operativo
+
+    def read(self, size):
+        data = self.mapped[self.offset:self.offset + size]
+        self.offset += len(data)
+
+        # Libera las páginas completas que ya se copiaron
+        release_to = self.offset - self.offset % mmap.PAGESIZE
+        if release_to > self.released and hasattr(self.mapped, 'madvise'):
+            self.mapped.madvise(mmap.MADV_DONTNEED, self.released, release_to - self.released)
+            self.released = release_to
+        return data
+
+
+def lex_file(path, chunk_size=CHUNK_SIZE, encoding='utf-8', use_mmap=False):
+    """
+    Analiza léxicamente un archivo sin leerlo completo en memoria.
+    Con use_mmap=True recorre el archivo a través de un mmap; si no, lo lee
+    en bloques de `chunk_size` bytes. Produce los tokens de forma perezosa.
+    """
+    with open(path, 'rb') as file:
+        if use_mmap:
+            try:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Los archivos vacíos no se pueden mapear
+                return
+            with mapped:
+                yield from lex_stream(_MmapReader(mapped), chunk_size, encoding)
+        else:
+            yield from lex_stream(file, chunk_size, encoding)
+
+
+def lexer_numpy(source_code):
+    """
+    Analizador léxico vectorizado de numpy_lexer.py. NumPy es opcional: se
+    importa la primera vez que se usa esta implementación.
+    """
+    from numpy_lexer import lexer_numpy
+    return lexer_numpy(source_code)
+
+
+# Implementaciones disponibles del analizador léxico, por nombre
+lexer_backends = {
+    'regex': lexer,
+    'reference': lexer_reference,
+    'numpy': lexer_numpy,
+}
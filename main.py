@@ -1,82 +1,19 @@
-from lexer import lexer
+import os
+
+from golden import CORPUS, load_corpus
+from lexer import TypeView, lexer
 from parser import parser
 
 def run_tests(lexer_func, parser_func):
+    # Los ejemplos viven en el corpus de casos dorados (ver golden.py)
     ejemplos = [
         {
-            "codigo": "int a = 10;",
-            "descripcion": "Declaración simple de int",
-            "salida_esperada_tokens": [
-                ('IDENTIFIER', 'int'),
-                ('IDENTIFIER', 'a'),
-                ('OPERATOR', '='),
-                ('NUMBER', '10'),
-                ('SEMICOLON', ';')
-            ],
-            "salida_esperada_ast": [
-                ('DECLARATION', 'int', 'a', 10)
-            ]
-        },
-        {
-            "codigo": "int b = a + 5;",
-            "descripcion": "Declaración con expresión suma",
-            "salida_esperada_tokens": [
-                ('IDENTIFIER', 'int'),
-                ('IDENTIFIER', 'b'),
-                ('OPERATOR', '='),
-                ('IDENTIFIER', 'a'),
-                ('OPERATOR', '+'),
-                ('NUMBER', '5'),
-                ('SEMICOLON', ';')
-            ],
-            "salida_esperada_ast": [
-                ('DECLARATION', 'int', 'b', ('+', 'a', 5))
-            ]
-        },
-        {
-            "codigo": "c = a + 1;",
-            "descripcion": "Asignación simple con expresión",
-            "salida_esperada_tokens": [
-                ('IDENTIFIER', 'c'),
-                ('OPERATOR', '='),
-                ('IDENTIFIER', 'a'),
-                ('OPERATOR', '+'),
-                ('NUMBER', '1'),
-                ('SEMICOLON', ';')
-            ],
-            "salida_esperada_ast": [
-                ('ASSIGNMENT', 'c', ('+', 'a', 1))
-            ]
-        },
-        {
-            "codigo": "float x = 3.14;",
-            "descripcion": "Declaración tipo float",
-            "salida_esperada_tokens": [
-                ('IDENTIFIER', 'float'),
-                ('IDENTIFIER', 'x'),
-                ('OPERATOR', '='),
-                ('NUMBER', '3.14'),
-                ('SEMICOLON', ';')
-            ],
-            "salida_esperada_ast": [
-                ('DECLARATION', 'float', 'x', 3.14)
-            ]
-        },
-        {
-            "codigo": "x = x * 2;",
-            "descripcion": "Asignación con multiplicación",
-            "salida_esperada_tokens": [
-                ('IDENTIFIER', 'x'),
-                ('OPERATOR', '='),
-                ('IDENTIFIER', 'x'),
-                ('OPERATOR', '*'),
-                ('NUMBER', '2'),
-                ('SEMICOLON', ';')
-            ],
-            "salida_esperada_ast": [
-                ('ASSIGNMENT', 'x', ('*', 'x', 2))
-            ]
+            "codigo": caso['source'],
+            "descripcion": caso['description'],
+            "salida_esperada_tokens": caso.get('tokens'),
+            "salida_esperada_ast": caso.get('ast'),
         }
+        for caso in load_corpus([os.path.join(CORPUS, 'main')])
     ]
 
     for i, ejemplo in enumerate(ejemplos, 1):
@@ -88,7 +25,7 @@ def run_tests(lexer_func, parser_func):
         try:
             tokens = lexer_func(ejemplo['codigo'])
             print("Tokens obtenidos:")
-            print(tokens)
+            print(TypeView(tokens))
             print("Tokens esperados:")
             print(ejemplo['salida_esperada_tokens'])
         except Exception as e:
@@ -96,7 +33,7 @@ def run_tests(lexer_func, parser_func):
             continue
         
         # Comprobar tokens (simple comparación)
-        if tokens == ejemplo['salida_esperada_tokens']:
+        if TypeView(tokens) == ejemplo['salida_esperada_tokens']:
             print("Tokens correctos ✔️")
         else:
             print("Tokens incorrectos ❌")
@@ -0,0 +1,224 @@
+import numpy as np
+
+from lexer import ASSIGN, EQUALS, IDENTIFIER, NUMBER, LexerError, kind_types, kind_values, lexer
+
+# === ANALIZADOR LÉXICO VECTORIZADO CON NUMPY ===
+# Alternativa a `lexer` para entradas ASCII muy grandes: en lugar de recorrer
+# el texto token por token con `token_regex`, carga cada trozo como un arreglo
+# uint8, clasifica todos los bytes a la vez y encuentra los límites de los
+# tokens con operaciones sobre arreglos. Produce exactamente los mismos tokens
+# que `lexer` y lanza LexerError en la misma posición.
+#
+# Cómo se reproducen las reglas de `token_definitions` sin recorrer el texto:
+# - Comentarios: un carácter está en un comentario si y solo si hay un '//'
+#   antes que él en su línea, así que cada comentario va desde el primer '//'
+#   de una línea hasta el salto de línea.
+# - Identificadores y números: se buscan las rachas de caracteres de palabra
+#   ([A-Za-z0-9_]). Una racha que empieza con letra o '_' es un identificador.
+#   Una que empieza con dígitos es un número (sus dígitos iniciales) seguido,
+#   si queda algo, de un identificador.
+# - Decimales: un '.' es decimal si lo rodean dígitos y la racha anterior es
+#   solo de dígitos y no es a su vez la parte decimal de otro número ("1.2.3"
+#   falla en el segundo '.', como en el lexer). La racha siguiente aporta sus
+#   dígitos iniciales al número.
+# - '==': en una racha de '=', cada par desde el inicio es un EQUALS y un '='
+#   final sin pareja es un ASSIGN.
+# - Palabras clave: identificadores con la longitud y los bytes de una de ellas.
+# - Líneas: suma acumulada de los saltos de línea.
+# Los trozos terminan justo después de un salto de línea, donde ningún token
+# puede quedar partido. Los textos con caracteres no ASCII (donde \w, \d y \s
+# de `re` aceptan más caracteres) se delegan en `lexer`.
+
+# Caracteres por trozo; los arreglos auxiliares ocupan unas decenas de bytes por carácter
+CHUNK_SIZE = 1 << 22
+
+# Clases de byte
+_INVALID, _DIGIT, _ALPHA, _DOT, _EQUAL, _OPERATOR, _SLASH, _PAREN, _BRACE, _SEMICOLON, _SPACE, _NEWLINE = range(12)
+_COMMENT = 12
+
+_CLASSES = np.zeros(256, dtype=np.uint8)
+_CLASSES[ord('0'):ord('9') + 1] = _DIGIT
+_CLASSES[ord('a'):ord('z') + 1] = _ALPHA
+_CLASSES[ord('A'):ord('Z') + 1] = _ALPHA
+_CLASSES[ord('_')] = _ALPHA
+_CLASSES[ord('.')] = _DOT
+_CLASSES[ord('=')] = _EQUAL
+for _char in '+-*':
+    _CLASSES[ord(_char)] = _OPERATOR
+_CLASSES[ord('/')] = _SLASH
+_CLASSES[[ord('('), ord(')')]] = _PAREN
+_CLASSES[[ord('{'), ord('}')]] = _BRACE
+_CLASSES[ord(';')] = _SEMICOLON
+# Espacios ASCII según `\s` de `re` (incluye los separadores \x1c-\x1f)
+for _char in ' \t\r\x0b\x0c\x1c\x1d\x1e\x1f':
+    _CLASSES[ord(_char)] = _SPACE
+_CLASSES[ord('\n')] = _NEWLINE
+
+# Byte -> clase del token de un solo carácter
+_SINGLE = np.zeros(256, dtype=np.uint8)
+for _value, _kind in kind_values.items():
+    if len(_value) == 1 and kind_types[_kind] != 'IDENTIFIER':
+        _SINGLE[ord(_value)] = _kind
+
+# Palabras clave: (bytes, clase)
+_KEYWORDS = [(np.frombuffer(value.encode('ascii'), dtype=np.uint8), kind)
+             for value, kind in kind_values.items() if kind_types[kind] == 'IDENTIFIER']
+
+
+def _chunk_tokens(data):
+    """
+    Tokens de un trozo (arreglo uint8 que termina en salto de línea o en el
+    final de la fuente). Devuelve (valores, clases, líneas relativas, saltos
+    de línea del trozo) o lanza LexerError con la posición relativa.
+    """
+    size = len(data)
+    classes = _CLASSES[data]
+    newline = classes == _NEWLINE
+    newlines_before = np.cumsum(newline) - newline  # Saltos de línea antes de cada posición
+
+    # Comentarios: desde el primer '//' de cada línea hasta el salto de línea
+    slash = classes == _SLASH
+    pairs = np.flatnonzero(slash[:-1] & slash[1:])
+    if len(pairs):
+        _, first = np.unique(newlines_before[pairs], return_index=True)
+        comment_starts = pairs[first]
+        newline_positions = np.flatnonzero(newline)
+        following = np.searchsorted(newline_positions, comment_starts)
+        comment_ends = np.append(newline_positions, size)[following]
+        delta = np.zeros(size + 1, dtype=np.int8)
+        delta[comment_starts] = 1   # Hay a lo sumo un comentario por línea: sin índices repetidos
+        delta[comment_ends] = -1
+        classes[np.cumsum(delta[:size]) > 0] = _COMMENT
+
+    # Rachas de caracteres de palabra
+    word = (classes == _DIGIT) | (classes == _ALPHA)
+    previous_word = np.concatenate(([False], word[:-1]))
+    next_word = np.concatenate((word[1:], [False]))
+    run_starts = np.flatnonzero(word & ~previous_word)
+    run_ends = np.flatnonzero(word & ~next_word) + 1
+
+    # Fin de los dígitos iniciales de cada racha
+    letters = np.flatnonzero(classes == _ALPHA)
+    following = np.searchsorted(letters, run_starts)
+    first_letter = np.append(letters, size)[following]
+    digits_end = np.minimum(first_letter, run_ends)
+    digit_start = classes[run_starts] == _DIGIT
+    only_digits = digit_start & (digits_end == run_ends)
+
+    # Puntos decimales
+    dots = np.flatnonzero(classes == _DOT)
+    decimal = np.zeros(len(dots), dtype=bool)
+    dot_run = np.zeros(len(dots), dtype=np.int64)  # Racha que termina justo antes de cada punto
+    if len(dots) and len(run_starts):
+        dot_run = np.minimum(np.searchsorted(run_ends, dots), len(run_ends) - 1)
+        after = np.minimum(dots + 1, size - 1)
+        candidate = ((run_ends[dot_run] == dots) & only_digits[dot_run]
+                     & (dots + 1 < size) & (classes[after] == _DIGIT))
+        # La racha anterior no debe ser la parte decimal de otro número
+        candidate_at = np.zeros(size + 1, dtype=bool)
+        candidate_at[dots[candidate]] = True
+        before = run_starts[dot_run] - 1
+        decimal = candidate & ~candidate_at[np.where(before >= 0, before, size)]
+
+    # Errores: bytes no válidos y puntos que no son decimales
+    invalid = np.flatnonzero(classes == _INVALID)
+    bad_dots = dots[~decimal]
+    if len(invalid) or len(bad_dots):
+        raise LexerError(int(min(invalid[0] if len(invalid) else size, bad_dots[0] if len(bad_dots) else size)))
+
+    # Números: rachas que empiezan con dígito y no son la parte decimal de otro
+    decimal_runs = dot_run[decimal]
+    fraction = np.zeros(len(run_starts), dtype=bool)
+    fraction[decimal_runs + 1] = True
+    number_runs = np.flatnonzero(digit_start & ~fraction)
+    number_ends = digits_end[number_runs]
+    with_decimals = np.zeros(len(run_starts), dtype=bool)
+    with_decimals[decimal_runs] = True
+    extended = with_decimals[number_runs]
+    number_ends[extended] = digits_end[number_runs[extended] + 1]
+
+    # Identificadores: rachas que empiezan con letra, y el resto de las que empiezan con dígitos
+    identifier_runs = np.flatnonzero(~digit_start)
+    tails = np.flatnonzero(digit_start & (digits_end < run_ends))
+
+    # '==' y '='
+    equal = classes == _EQUAL
+    indices = np.arange(size)
+    equal_starts = equal & ~np.concatenate(([False], equal[:-1]))
+    offset = indices - np.maximum.accumulate(np.where(equal_starts, indices, 0))
+    next_equal = np.concatenate((equal[1:], [False]))
+    equals_tokens = np.flatnonzero(equal & (offset % 2 == 0) & next_equal)
+    assign_tokens = np.flatnonzero(equal & (offset % 2 == 0) & ~next_equal)
+
+    # Tokens de un solo carácter
+    single = np.flatnonzero((classes >= _OPERATOR) & (classes <= _SEMICOLON))
+
+    identifier_starts = np.concatenate((run_starts[identifier_runs], digits_end[tails]))
+    identifier_ends = np.concatenate((run_ends[identifier_runs], run_ends[tails]))
+
+    starts = np.concatenate((identifier_starts, run_starts[number_runs], equals_tokens, assign_tokens, single))
+    ends = np.concatenate((identifier_ends, number_ends, equals_tokens + 2, assign_tokens + 1, single + 1))
+    kinds = np.concatenate((
+        _identifier_kinds(data, identifier_starts, identifier_ends),
+        np.full(len(number_runs), NUMBER, dtype=np.uint8),
+        np.full(len(equals_tokens), EQUALS, dtype=np.uint8),
+        np.full(len(assign_tokens), ASSIGN, dtype=np.uint8),
+        _SINGLE[data[single]],
+    ))
+    order = np.argsort(starts, kind='stable')
+    starts, ends, kinds = starts[order], ends[order], kinds[order]
+
+    # Valores: los caracteres de todos los tokens en un solo texto, separados
+    # por '\0' (que nunca forma parte de un token), y un único split
+    lengths = ends - starts
+    separators = np.cumsum(lengths + 1) - 1
+    positions = np.arange(len(lengths) + int(lengths.sum())) + np.repeat(starts - separators + lengths, lengths + 1)
+    positions[separators] = size
+    values = np.append(data, np.uint8(0))[positions].tobytes().decode('ascii').split('\0')
+    values.pop()
+    return values, kinds, newlines_before[starts], int(newline.sum())
+
+
+def _identifier_kinds(data, starts, ends):
+    """
+    Clase de cada identificador [starts, ends): IDENTIFIER o la de la palabra
+    clave que forman sus bytes.
+    """
+    kinds = np.full(len(starts), IDENTIFIER, dtype=np.uint8)
+    lengths = ends - starts
+    for keyword, kind in _KEYWORDS:
+        candidates = np.flatnonzero(lengths == len(keyword))
+        for offset, byte in enumerate(keyword):
+            candidates = candidates[data[starts[candidates] + offset] == byte]
+        kinds[candidates] = kind
+    return kinds
+
+
+def lexer_numpy(source_code, line_number=1, chunk_size=CHUNK_SIZE):
+    """
+    Analizador léxico vectorizado. Misma entrada y salida que `lexer`.
+    """
+    if not source_code.isascii():
+        return lexer(source_code, line_number)
+
+    found_tokens = []
+    length = len(source_code)
+    base = 0
+    while base < length:
+        # Cortar justo después de un salto de línea (o al final de la fuente)
+        end = source_code.rfind('\n', base, base + chunk_size) + 1 if base + chunk_size < length else length
+        if end <= base:
+            end = source_code.find('\n', base + chunk_size) + 1 or length
+
+        chunk = source_code[base:end]
+        data = np.frombuffer(chunk.encode('ascii'), dtype=np.uint8)
+        try:
+            values, kinds, lines, newlines = _chunk_tokens(data)
+        except LexerError as error:
+            raise LexerError(base + error.position) from None
+
+        lines = (lines + line_number).tolist()
+        found_tokens.extend(zip(kinds.tolist(), values, lines))
+        line_number += newlines
+        base = end
+    return found_tokens
@@ -0,0 +1,251 @@
+import random
+from functools import partial
+
+from evaluator import INTERNAL_PREFIX, binary_operations, evaluate
+from generator import generate_program
+from lexer import lexer
+from parser import parser
+from treewalk import Blocks, postorder
+
+# === OPTIMIZADOR DEL AST ===
+# Transforma el AST de `parser` en otro equivalente (misma semántica que
+# `evaluator.evaluate`) pero con menos nodos:
+# - Plegado de constantes: ('/', 2, 4) -> 0, ('+', 1.5, 1) -> 2.5.
+# - Eliminación de if cuya condición es una constante igual a 0.
+# - Incorporación directa del cuerpo de los if cuya condición es una constante
+#   distinta de 0.
+# - Eliminación de subexpresiones comunes dentro de una sentencia: cada
+#   subexpresión repetida se calcula una vez en una variable temporal
+#   (TEMP_PREFIX seguido de un número) asignada justo antes de la sentencia.
+#   Las temporales son variables internas (ver evaluator.py): no aparecen en el
+#   resultado de ningún motor. Para que los errores sean los mismos (por
+#   ejemplo, ZeroDivisionError antes que NameError en `(q / 0) + (b + c) * (b + c)`),
+#   una subexpresión solo se adelanta si todo lo que se evalúa antes que ella
+#   en la sentencia es una constante u otra temporal.
+# Todo el recorrido es iterativo, así que admite programas muy anidados.
+
+# Prefijo de las variables temporales creadas por la eliminación de subexpresiones
+TEMP_PREFIX = INTERNAL_PREFIX + 'cse'
+
+
+def count_nodes(ast):
+    """
+    Cuenta los nodos del AST: sentencias, operaciones, variables y constantes.
+    """
+    total = 0
+    stack = list(ast)
+    while stack:
+        node = stack.pop()
+        total += 1
+        if isinstance(node, tuple):
+            kind = node[0]
+            if kind == 'DECLARATION':
+                stack.extend(node[3:])
+            elif kind == 'ASSIGNMENT':
+                stack.append(node[2])
+            elif kind == 'IF':
+                stack.append(node[1])
+                stack.extend(node[2])
+            else:
+                stack.extend(node[1:])
+    return total
+
+
+def fold_expression(node, report=None):
+    """
+    Pliega las operaciones cuyos dos operandos son constantes.
+    Las divisiones entre cero no se pliegan para que el error ocurra al ejecutar.
+    """
+    results = []
+    for current in postorder(node):
+        if not isinstance(current, tuple):
+            results.append(current)
+            continue
+
+        right, left = results.pop(), results.pop()
+        op = current[0]
+        if _is_constant(left) and _is_constant(right) and not (op == '/' and right == 0):
+            results.append(binary_operations[op](left, right))
+            if report is not None:
+                report['folded'] += 1
+        elif left is current[1] and right is current[2]:
+            results.append(current)
+        else:
+            results.append((op, left, right))
+    return results[-1]
+
+
+def _is_constant(node):
+    return isinstance(node, (int, float))
+
+
+class _Eliminator:
+    """
+    Eliminación de subexpresiones comunes con numeración de valores: cada
+    subexpresión recibe un número según su estructura, así que dos subárboles
+    iguales tienen el mismo número.
+    """
+
+    def __init__(self):
+        self.counter = 0
+
+    def run(self, expression):
+        """
+        Recibe la expresión de una sentencia. Devuelve (asignaciones temporales,
+        expresión reescrita).
+        """
+        numbers = {}       # id(nodo) -> número de valor
+        table = {}         # (op, número izq., número der.) o constante/variable -> número
+        for current in postorder(expression):
+            if isinstance(current, tuple):
+                key = (current[0], numbers[id(current[1])], numbers[id(current[2])])
+            else:
+                key = (type(current), current)
+            numbers[id(current)] = table.setdefault(key, len(table))
+
+        # Usos de cada subexpresión sin contar las repeticiones internas de otra
+        # subexpresión repetida (esa se calculará una sola vez)
+        uses = {}
+        stack = [expression]
+        while stack:
+            current = stack.pop()
+            if not isinstance(current, tuple):
+                continue
+            number = numbers[id(current)]
+            uses[number] = uses.get(number, 0) + 1
+            if uses[number] == 1:
+                stack.extend((current[2], current[1]))
+
+        repeated = {number for number, count in uses.items() if count > 1}
+        if not repeated:
+            return [], expression
+
+        # Reescritura en postorden: las temporales internas se definen primero y
+        # las subexpresiones que ya tienen temporal no se recorren. En `results`
+        # quedan, antes de los dos operandos, los operandos izquierdos ya
+        # calculados de los nodos que contienen al actual.
+        names = {}
+        assignments = []
+        results = []
+        for current in postorder(expression, lambda node: numbers[id(node)] in names):
+            if not isinstance(current, tuple):
+                results.append(current)
+                continue
+            number = numbers[id(current)]
+            if number in names:
+                results.append(names[number])
+                continue
+            node = (current[0], results[-2], results[-1])
+            if number in repeated and all(map(_is_computed, results[:-2])):
+                self.counter += 1
+                names[number] = f'{TEMP_PREFIX}{self.counter}'
+                assignments.append(('ASSIGNMENT', names[number], node))
+                node = names[number]
+            del results[-2:]
+            results.append(node)
+        return assignments, results[-1]
+
+
+def _is_computed(node):
+    # Constante o temporal: leerla no lanza errores
+    return _is_constant(node) or (isinstance(node, str) and node.startswith(TEMP_PREFIX))
+
+
+def optimize(ast, fold=True, cse=True):
+    """
+    Optimiza el AST. Devuelve (nuevo_ast, reporte), donde el reporte indica
+    cuántos nodos había, cuántos quedan y cuántas transformaciones se aplicaron.
+    """
+    report = {'folded': 0, 'branches_removed': 0, 'branches_inlined': 0, 'temporaries': 0}
+    eliminator = _Eliminator() if cse else None
+    result = []
+
+    # El estado de cada bloque es su lista de salida; al cerrar el cuerpo de un
+    # if, el nodo IF con el cuerpo optimizado se añade a la salida exterior
+    blocks = Blocks(ast, result)
+    for statement, out in blocks:
+        kind = statement[0]
+        if kind == 'IF':
+            condition = fold_expression(statement[1], report) if fold else statement[1]
+            if _is_constant(condition):
+                if condition == 0:
+                    report['branches_removed'] += 1
+                else:
+                    report['branches_inlined'] += 1
+                    blocks.enter(statement[2], out)
+                continue
+            if eliminator is not None:
+                temporaries, condition = eliminator.run(condition)
+                out.extend(temporaries)
+            body = []
+            blocks.enter(statement[2], body, partial(out.append, ('IF', condition, body)))
+            continue
+
+        # Declaración o asignación: la expresión es el último elemento (si existe)
+        has_value = kind == 'ASSIGNMENT' or len(statement) > 3
+        if not has_value:
+            out.append(statement)
+            continue
+        value = fold_expression(statement[-1], report) if fold else statement[-1]
+        if eliminator is not None:
+            temporaries, value = eliminator.run(value)
+            out.extend(temporaries)
+        out.append(statement[:-1] + (value,))
+
+    report['temporaries'] = eliminator.counter if eliminator is not None else 0
+    report['nodes_before'] = count_nodes(ast)
+    report['nodes_after'] = count_nodes(result)
+    report['eliminated'] = report['nodes_before'] - report['nodes_after']
+    return result, report
+
+
+# === VERIFICACIÓN ===
+# Programas con la misma semántica antes y después de optimizar, incluido el
+# orden de los errores cuando hay subexpresiones repetidas.
+_CHECK_PROGRAMS = [
+    'x = (q / 0) + (b + c) * (b + c);',
+    'x = (b + c) * (b + c) + q / 0;',
+    'if ((a / b) == (a / b)) { c = (a - q) * (a - q); }',
+]
+
+_CHECK_VALUES = (0, 1, -3, 7, 2.5)
+
+
+def _outcome(ast, inputs):
+    # Variables finales o tipo y mensaje del error
+    try:
+        return 'ok', repr(sorted(evaluate(ast, inputs).items()))
+    except (ArithmeticError, NameError, ValueError) as error:
+        return type(error).__name__, str(error)
+
+
+def check_random_programs(seed=0, programs=300, runs=4):
+    """
+    Ejecuta programas aleatorios con `evaluator.evaluate` antes y después de
+    optimizarlos y comprueba que terminan con las mismas variables o con el
+    mismo error. Devuelve el número de ejecuciones comparadas.
+    """
+    rng = random.Random(seed)
+    names = ['a', 'b', 'c', 'q']
+    sources = _CHECK_PROGRAMS + [
+        generate_program(rng.randint(1, 12), seed=rng.randrange(2 ** 32), depth=4, comments=0, if_ratio=0.3,
+                         names=names)
+        for _ in range(programs)
+    ]
+
+    compared = temporaries = 0
+    for source in sources:
+        ast = parser(lexer(source))
+        optimized, report = optimize(ast)
+        temporaries += report['temporaries']
+        for _ in range(runs):
+            inputs = {name: rng.choice(_CHECK_VALUES) for name in names if rng.random() < 0.8}
+            expected, actual = _outcome(ast, inputs), _outcome(optimized, inputs)
+            assert expected == actual, f"{source!r} con {inputs}: {expected} != {actual}"
+            compared += 1
+    assert temporaries, "Ningún programa creó temporales"
+    return compared
+
+
+if __name__ == "__main__":
+    print(f"{check_random_programs()} ejecuciones verificadas ✔️")
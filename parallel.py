@@ -0,0 +1,102 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import LexerError, lexer
+
+# === ANÁLISIS LÉXICO PARALELO DE UN SOLO ARCHIVO ===
+# La fuente se corta justo después de un ';', '{' o '}' que no esté dentro de
+# un comentario. Esos tokens son de un solo carácter, así que el lexer puede
+# empezar en el punto de corte como si fuera el inicio de un archivo; cada trozo
+# se analiza en un proceso distinto y los resultados se concatenan en orden.
+
+# Tamaño mínimo de cada trozo: por debajo de esto no compensa repartir el trabajo
+MIN_CHUNK = 1 << 18
+
+_BOUNDARY = re.compile(r'[;{}]')
+
+
+def next_boundary(source_code, position):
+    """
+    Devuelve la primera posición segura de corte a partir de `position`
+    (justo después de un ';', '{' o '}' fuera de comentario), o None si no hay.
+    Como el lenguaje no tiene cadenas, un carácter está dentro de un comentario
+    si y solo si hay un '//' antes que él en la misma línea.
+    """
+    while True:
+        match = _BOUNDARY.search(source_code, position)
+        if match is None:
+            return None
+        index = match.start()
+        line_start = source_code.rfind('\n', 0, index) + 1
+        if source_code.find('//', line_start, index) == -1:
+            return index + 1
+
+        # El resto de la línea es comentario: seguir en la línea siguiente
+        position = source_code.find('\n', index)
+        if position == -1:
+            return None
+
+
+def split_source(source_code, parts, min_chunk=MIN_CHUNK):
+    """
+    Divide la fuente en hasta `parts` trozos con cortes seguros.
+    Devuelve la lista de posiciones [0, corte1, ..., len(source_code)].
+    """
+    length = len(source_code)
+    parts = max(1, min(parts, length // max(min_chunk, 1)))
+    points = [0]
+    for k in range(1, parts):
+        target = max(length * k // parts, points[-1])
+        point = next_boundary(source_code, target)
+        if point is None or point >= length:
+            break
+        if point > points[-1]:
+            points.append(point)
+    points.append(length)
+    return points
+
+
+def _lex_chunk(args):
+    """
+    Tarea de cada proceso: analiza un trozo empezando en la línea indicada.
+    Devuelve ('ok', tokens) o ('error', posición relativa al trozo).
+    """
+    chunk, line_number = args
+    try:
+        return 'ok', lexer(chunk, line_number)
+    except LexerError as error:
+        return 'error', error.position
+
+
+def lex_parallel(source_code, workers=None, min_chunk=MIN_CHUNK, executor=None):
+    """
+    Analizador léxico paralelo. Produce exactamente la misma lista de tokens que
+    `lexer` y, si hay un error, la misma posición en el LexerError.
+    Se puede pasar un `executor` ya creado para reutilizarlo entre llamadas.
+    """
+    workers = workers or os.cpu_count() or 1
+    points = split_source(source_code, workers, min_chunk)
+    if len(points) == 2:
+        return lexer(source_code)
+
+    # Cada trozo recibe la línea en la que empieza
+    jobs = []
+    line_number = 1
+    for start, end in zip(points, points[1:]):
+        jobs.append((source_code[start:end], line_number))
+        line_number += source_code.count('\n', start, end)
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_lex_chunk, jobs))
+    else:
+        results = list(executor.map(_lex_chunk, jobs))
+
+    # Se recorren en orden: el primer error encontrado es el que reportaría `lexer`
+    found_tokens = []
+    for start, (status, value) in zip(points, results):
+        if status == 'error':
+            raise LexerError(start + value)
+        found_tokens.extend(value)
+    return found_tokens
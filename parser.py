@@ -1,4 +1,10 @@
+from lexer import (ASSIGN, IDENTIFIER, KW_FLOAT, KW_IF, KW_INT, LBRACE, LPAREN, NUMBER, RBRACE, RPAREN, SEMICOLON,
+                   as_kinds, as_type, kind_of, kind_types, kind_values, name_kinds)
+
 # === ANALIZADOR SINTÁCTICO (Parser) ===
+# Trabaja sobre los tokens con clase entera de `lexer` (ver "CLASES DE TOKEN"
+# en lexer.py). Los tokens con tipo de texto se aceptan por compatibilidad y se
+# convierten al crear el cursor.
 
 
 # Definición de la precedencia de operadores.
@@ -12,12 +18,102 @@ precedence = {
     '/': 2
 }
 
-def parser(tokens):
+# Precedencia indexada por la clase del token; -1 si no es un operador binario
+_PRECEDENCE = [-1] * len(kind_types)
+for _op, _prec in precedence.items():
+    _PRECEDENCE[kind_values[_op]] = _prec
+
+class TokenStream:
+    """
+    Cursor sobre una secuencia de tokens.
+    En lugar de eliminar tokens del inicio de la lista (que cuesta O(n) cada vez),
+    avanza un índice, de modo que el análisis completo es lineal.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = as_kinds(tokens)  # Secuencia de tokens con clase (no se modifica)
+        self.index = 0        # Posición del siguiente token a consumir
+        self.interner = None  # Tabla de nodos compartidos (ver interning.py), opcional
+        self.errors = None    # Lista de diagnósticos en el modo de recuperación
+
+    def __bool__(self):
+        # Verdadero mientras queden tokens por consumir
+        return self.index < len(self.tokens)
+
+    def peek(self):
+        """
+        Devuelve el token actual sin consumirlo, o None si no quedan tokens.
+        """
+        if self.index < len(self.tokens):
+            return self.tokens[self.index]
+        return None
+
+    def advance(self):
+        """
+        Consume y devuelve el token actual.
+        """
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, kind, message):
+        """
+        Consume el token actual si es de la clase indicada;
+        en caso contrario lanza SyntaxError con el mensaje dado.
+        """
+        token = self.peek()
+        if token is None or token[0] != kind:
+            raise SyntaxError(message)
+        return self.advance()
+
+
+class IterTokenStream(TokenStream):
+    """
+    Cursor sobre cualquier iterable de tokens, por ejemplo el generador de `lex_file`.
+    Solo conserva el token actual (anticipación de un token), así que la memoria
+    usada no depende del tamaño de la entrada.
+    """
+
+    def __init__(self, tokens):
+        self.iterator = iter(tokens)
+        self.index = 0                                # Tokens consumidos hasta ahora
+        self.interner = None
+        self.errors = None
+        self.current = next(self.iterator, None)      # Token actual, None al terminar
+        if self.current is not None and isinstance(self.current[0], str):
+            # Tokens con tipo de texto: se convierten a clases a medida que se leen
+            self.iterator = ((kind_of(tk_type, tk_val), tk_val, line) for tk_type, tk_val, line in self.iterator)
+            self.current = (kind_of(*self.current[:2]), self.current[1], self.current[2])
+
+    def __bool__(self):
+        return self.current is not None
+
+    def peek(self):
+        return self.current
+
+    def advance(self):
+        token = self.current
+        if token is None:
+            raise IndexError("No hay más tokens.")
+        self.current = next(self.iterator, None)
+        self.index += 1
+        return token
+
+
+def parser(tokens, interner=None, errors=None):
     """
     Función principal del parser.
-    Recibe una lista de tokens (tuplas de tipo y valor) y devuelve el árbol de sintaxis abstracta (AST).
+    Recibe una lista de tokens (de `lexer`) y devuelve el árbol de sintaxis abstracta (AST).
+    Si se pasa un `interner` (interning.Interner), las expresiones iguales comparten
+    los mismos nodos y el resultado es un grafo acíclico en lugar de un árbol.
+    Si se pasa una lista `errors`, los errores de sintaxis no detienen el análisis
+    (ver `parse_recovering`): se añaden a la lista y se devuelve el AST parcial.
     """
-    tokens = tokens.copy()  # Copia para no modificar la lista original
+    tokens = TokenStream(tokens)  # Cursor sobre la lista original, que no se modifica
+    tokens.interner = interner
+    if errors is not None:
+        tokens.errors = errors
+        return parse_recovering(tokens)
     ast = []  # AST: lista de sentencias analizadas
 
     # Mientras haya tokens por analizar, procesa una sentencia
@@ -26,25 +122,33 @@ def parser(tokens):
     return ast
 
 
+def iter_statements(token_iterable, interner=None):
+    """
+    Versión en flujo del parser.
+    Recibe cualquier iterable de tokens y produce cada sentencia de nivel superior
+    (DECLARATION, ASSIGNMENT o IF) en cuanto termina de analizarla. Los errores de
+    sintaxis se lanzan al llegar a la sentencia que los contiene.
+    """
+    tokens = IterTokenStream(token_iterable)
+    tokens.interner = interner
+    while tokens:
+        yield parse_statement(tokens)
+
+
 def parse_statement(tokens):
     """
-    Determina si una sentencia es una declaración o una asignación.
+    Analiza una sentencia con la función que `statement_parsers` asocia a la
+    clase de su primer token.
     """
-    # Declaración si el primer token es un tipo válido (int o float)
-    if tokens[0][0] == 'IDENTIFIER' and tokens[0][1] in ('int', 'float'):
-        return parse_declaration(tokens)
-    
-    # If
-    if tokens[0][0] == 'IDENTIFIER' and tokens[0][1] == 'if':
-        return parse_if_statement(tokens)
+    token = tokens.peek()
+    parse = statement_parsers.get(token[0])
+
+    # Si no es ninguna de las sentencias conocidas, lanza error de sintaxis
+    if parse is None:
+        line = token[2]
+        raise SyntaxError(f"Linea {line}: Sentencia inválida. Token inesperado: {as_type(token)}")
 
-    # Asignación si el primer token es un identificador de variable
-    if tokens[0][0] == 'IDENTIFIER':
-        return parse_assignment(tokens)
-    
-    # Si no es ninguna de las anteriores, lanza error de sintaxis
-    line = tokens[0][2]
-    raise SyntaxError(f"Linea {line}: Sentencia inválida. Token inesperado: {tokens[0]}")
+    return parse(tokens)
 
 
 def parse_declaration(tokens):
@@ -56,7 +160,8 @@ def parse_declaration(tokens):
     identificador = parse_id(tokens)     # Nombre de la variable
 
     # Si el siguiente token es '=', parsear una expresión
-    if tokens and tokens[0][0] == 'OPERATOR' and tokens[0][1] == '=':
+    token = tokens.peek()
+    if token is not None and token[0] == ASSIGN:
         parse_equals(tokens)
         expr = parse_expression(tokens)
         parse_semi(tokens)
@@ -86,8 +191,8 @@ def parse_type(tokens):
     """
     if not tokens:
         raise SyntaxError("Se esperaba un tipo, pero no hay más tokens.")
-    tk_type, tk_val, line = tokens.pop(0)
-    if tk_type == 'IDENTIFIER' and tk_val in ('int', 'float'):
+    tk_type, tk_val, line = tokens.advance()
+    if tk_type == KW_INT or tk_type == KW_FLOAT:
         return tk_val
     raise SyntaxError(f"Línea {line}: Tipo inválido: {tk_val}")
 
@@ -98,8 +203,8 @@ def parse_id(tokens):
     """
     if not tokens:
         raise SyntaxError("Se esperaba un identificador, pero no hay más tokens.")
-    tk_type, tk_val, line = tokens.pop(0)
-    if tk_type == 'IDENTIFIER':
+    tk_type, tk_val, line = tokens.advance()
+    if tk_type in name_kinds:
         return tk_val
     raise SyntaxError(f"Línea {line}: Identificador inválido: {tk_val}")
 
@@ -110,8 +215,8 @@ def parse_num(tokens):
     """
     if not tokens:
         raise SyntaxError("Se esperaba un número, pero no hay más tokens.")
-    tk_type, tk_val, line = tokens.pop(0)
-    if tk_type == 'NUMBER':
+    tk_type, tk_val, line = tokens.advance()
+    if tk_type == NUMBER:
         return float(tk_val) if '.' in tk_val else int(tk_val)  # Convierte a float si tiene punto decimal
     raise SyntaxError(f"Línea {line}: Número inválido: {tk_val}")
 
@@ -122,8 +227,8 @@ def parse_equals(tokens):
     """
     if not tokens:
         raise SyntaxError("Se esperaba '=' pero no hay más tokens.")
-    tk_type, tk_val, line = tokens.pop(0)
-    if not (tk_type == 'OPERATOR' and tk_val == '='):
+    tk_type, tk_val, line = tokens.advance()
+    if tk_type != ASSIGN:
         raise SyntaxError(f"Línea {line}: Se esperaba '=' pero se encontró {tk_val}")
 
 
@@ -133,78 +238,260 @@ def parse_semi(tokens):
     """
     if not tokens:
         raise SyntaxError("Se esperaba ';' pero no hay más tokens.")
-    tk_type, tk_val, line = tokens.pop(0)
-    if tk_type != 'SEMICOLON':
+    tk_type, tk_val, line = tokens.advance()
+    if tk_type != SEMICOLON:
         raise SyntaxError(f"Línea {line}: Se esperaba ';' pero se encontró {tk_val}")
 
 
 def parse_expression(tokens, min_prec=0):
     """
     Analiza una expresión aritmética con paréntesis y precedencia.
-    Utiliza recursividad para respetar la prioridad de los operadores.
+    Usa pilas explícitas de operandos y operadores (algoritmo shunting-yard) en
+    lugar de recursividad, así que no hay límite de anidamiento. Los operadores
+    de igual precedencia se agrupan por la izquierda.
+    Solo se aceptan, fuera de paréntesis, operadores con precedencia >= min_prec.
     """
-    if not tokens:
-        raise SyntaxError("Expresión vacía.")
-
-    # Parsea el primer operando: número, identificador o expresión entre paréntesis
-    if tokens[0][0] == 'NUMBER':
-        node = parse_num(tokens)
-    elif tokens[0][0] == 'IDENTIFIER':
-        node = parse_id(tokens)
-    elif tokens[0][0] == 'PAREN' and tokens[0][1] == '(':
-        tokens.pop(0)  # Consumir '('
-        node = parse_expression(tokens)
-        if not tokens or tokens[0][0] != 'PAREN' or tokens[0][1] != ')':
-            raise SyntaxError(f"Linea {tokens[0][2]}: Se esperaba ')' en la expresión.")
-        tokens.pop(0)  # Consumir ')'
+    operands = []   # Nodos ya construidos
+    operators = []  # Pares (precedencia, operador); None marca un '(' abierto
+    depth = 0       # Paréntesis abiertos sin cerrar
+    interner = tokens.interner
+
+    while True:
+        # Operando: número, identificador o apertura de paréntesis
+        token = tokens.peek()
+        if token is None:
+            raise SyntaxError("Expresión vacía.")
+
+        kind = token[0]
+        if kind == LPAREN:
+            tokens.advance()  # Consumir '('
+            operators.append(None)
+            depth += 1
+            continue
+        # La clase ya está comprobada: se consume el token sin parse_num/parse_id
+        if kind == NUMBER:
+            tokens.advance()
+            value = token[1]
+            operands.append(float(value) if '.' in value else int(value))
+        elif kind in name_kinds:
+            tokens.advance()
+            operands.append(token[1])
+        else:
+            raise SyntaxError(f"Linea {token[2]}: Expresión inválida. Se encontró {token[1]}")
+        if interner is not None:
+            operands[-1] = interner.leaf(operands[-1])
+
+        # Operadores binarios y cierres de paréntesis que siguen al operando
+        while True:
+            token = tokens.peek()
+            if token is not None:
+                op_prec = _PRECEDENCE[token[0]]
+                if op_prec >= 0 and op_prec >= (0 if depth else min_prec):
+                    # Reducir los operadores pendientes de precedencia mayor o igual
+                    while operators and operators[-1] is not None and operators[-1][0] >= op_prec:
+                        _reduce(operands, operators, interner)
+                    tokens.advance()  # Consumir operador
+                    operators.append((op_prec, token[1]))
+                    break
+
+            # La expresión (o el paréntesis actual) termina aquí
+            while operators and operators[-1] is not None:
+                _reduce(operands, operators, interner)
+
+            if not depth:
+                return operands[-1]  # Retorna el nodo final de la expresión
+
+            if token is None:
+                raise SyntaxError("Se esperaba ')' pero no hay más tokens.")
+            if token[0] != RPAREN:
+                raise SyntaxError(f"Linea {token[2]}: Se esperaba ')' en la expresión.")
+            tokens.advance()  # Consumir ')'
+            operators.pop()   # Quitar la marca del '('
+            depth -= 1
+
+
+def _reduce(operands, operators, interner):
+    """
+    Combina los dos últimos operandos con el último operador pendiente
+    en un nodo de expresión binaria: (operador, izquierdo, derecho).
+    """
+    _, op = operators.pop()
+    rhs = operands.pop()
+    if interner is None:
+        operands[-1] = (op, operands[-1], rhs)
     else:
-        raise SyntaxError(f"Linea {tokens[0][2]}: Expresión inválida. Se encontró {tokens[0][1]}")
+        operands[-1] = interner.node(op, operands[-1], rhs)
 
-    # Parsea operadores y operandos posteriores según la precedencia
-    while tokens and (tokens[0][0] in ('OPERATOR', 'EQUALS')):
-        op = tokens[0][1]
-        op_prec = precedence.get(op, -1)
-        if op_prec < min_prec:
-            break
 
-        tokens.pop(0)  # Consumir operador
-        rhs = parse_expression(tokens, op_prec + 1)  # Operando derecho
+def parse_if_header(tokens):
+    """
+    Analiza la cabecera de un if hasta la llave de apertura: if (condición) {
+    Devuelve la línea del 'if' y la condición.
+    """
+    tk_type, tk_val, line = tokens.advance()
+    if tk_type != KW_IF:
+        raise SyntaxError(f"Línea {line}: Se esperaba 'if' pero se encontró {tk_val}")
 
-        # Crea un nodo de expresión binaria: (operador, izquierdo, derecho)
-        node = (op, node, rhs)
+    tokens.expect(LPAREN, f"Línea {line}: Se esperaba '(' después de 'if'")
 
-    return node  # Retorna el nodo final de la expresión
+    condition = parse_expression(tokens)
+
+    tokens.expect(RPAREN, f"Línea {line}: Se esperaba ')' después de la condición")
+
+    token = tokens.peek()
+    if token is None or token[0] != LBRACE:
+        raise SyntaxError(f"Línea {line}: Se esperaba '{{' después de ')'")
+    tokens.advance()  # Consumir '{'
+
+    return line, condition
 
 
 def parse_if_statement(tokens):
     """
     Analiza una estructura condicional if.
     Forma esperada: if (condición) { sentencias }
+    Los if anidados se manejan con una pila explícita de bloques abiertos en
+    lugar de recursividad, así que no hay límite de anidamiento.
     """
-    tk_type, tk_val, line = tokens.pop(0)
-    if tk_type != 'IDENTIFIER' or tk_val != 'if':
-        raise SyntaxError(f"Línea {line}: Se esperaba 'if' pero se encontró {tk_val}")
+    blocks = []  # Tripletas (línea, condición, cuerpo) de los if abiertos
+
+    while True:
+        line, condition = parse_if_header(tokens)
+        blocks.append((line, condition, []))
+
+        # Llenar el bloque más interno hasta encontrar otro if o su '}'
+        while True:
+            token = tokens.peek()
+            if token is None:
+                raise SyntaxError(f"Línea {blocks[-1][0]}: Se esperaba '}}' para cerrar el bloque if")
+
+            if token[0] == RBRACE:
+                tokens.advance()  # Consumir '}'
+                _, condition, body = blocks.pop()
+                node = ('IF', condition, body)
+                if not blocks:
+                    return node
+                blocks[-1][2].append(node)
+            elif token[0] == KW_IF:
+                break  # Abrir un if anidado
+            else:
+                blocks[-1][2].append(parse_statement(tokens))
+
+
+# === TABLA DE SENTENCIAS ===
+# Clase del primer token -> función que analiza la sentencia. Una forma nueva
+# (por ejemplo, `while`) solo necesita su clase en lexer.py y una entrada
+# aquí; las que abren bloques también se reconocen en los bucles de
+# `parse_if_statement` y `parse_recovering`, que llevan la pila de bloques.
+statement_parsers = {
+    KW_IF: parse_if_statement,
+    KW_INT: parse_declaration,
+    KW_FLOAT: parse_declaration,
+    IDENTIFIER: parse_assignment,
+}
 
-    if not tokens or tokens[0][0] != 'PAREN' or tokens[0][1] != '(':
-        raise SyntaxError(f"Línea {line}: Se esperaba '(' después de 'if'")
-    tokens.pop(0)  # Consumir '('
 
-    condition = parse_expression(tokens)
+def statement_parser_reference(token):
+    """
+    Selección original de la función de una sentencia: una cadena de if/elif
+    que compara el tipo y el texto de un token con tipo de texto. Se conserva
+    como línea base de `statement_parsers` en `benchmark.bench_statements`.
+    Devuelve None si ninguna sentencia empieza con `token`.
+    """
+    if token[0] == 'IDENTIFIER' and token[1] == 'if':
+        return parse_if_statement
+    if token[0] == 'IDENTIFIER' and token[1] in ('int', 'float'):
+        return parse_declaration
+    if token[0] == 'IDENTIFIER':
+        return parse_assignment
+    return None
+
 
-    if not tokens or tokens[0][0] != 'PAREN' or tokens[0][1] != ')':
-        raise SyntaxError(f"Línea {line}: Se esperaba ')' después de la condición")
-    tokens.pop(0)  # Consumir ')'
+# === MODO DE RECUPERACIÓN ===
+# En lugar de detenerse en el primer error, registra un diagnóstico, descarta
+# tokens hasta el siguiente ';' o '}' y sigue analizando. Cada token se
+# descarta a lo sumo una vez, así que el costo es lineal aunque haya miles de
+# errores. Si al descartar aparece un '{' (por ejemplo, en un if con la
+# condición mal escrita), su bloque se sigue analizando para reportar sus
+# errores, pero se omite del AST.
 
-    if not tokens or tokens[0][0] != 'BRACE' or tokens[0][1] != '{':
-        raise SyntaxError("Línea",{line},": Se esperaba '{' después de ')'")
-    tokens.pop(0)  # Consumir '{'
+# Condición de los bloques que se analizan pero no se incluyen en el AST
+_DISCARDED = object()
 
-    body = []
-    while tokens and not (tokens[0][0] == 'BRACE' and tokens[0][1] == '}'):
-        body.append(parse_statement(tokens))
 
-    if not tokens or tokens[0][0] != 'BRACE' or tokens[0][1] != '}':
-        raise SyntaxError("Línea",{line},": Se esperaba '}' para cerrar el bloque if")
-    tokens.pop(0)  # Consumir '}'
+def _report(tokens, line, message):
+    tokens.errors.append({'kind': 'syntax', 'line': line, 'message': message})
+
+
+def _synchronize(tokens, error, start):
+    """
+    Registra el error en `tokens.errors` y descarta tokens hasta el siguiente
+    ';' (que se consume), '{' (que se consume) o '}' (que no se consume).
+    `start` es el índice del primer token de la sentencia que falló; la línea
+    del error es la del último token consumido (o la del siguiente, si no se
+    consumió ninguno). Devuelve el token donde se detuvo (';', '{' o '}') o
+    None si se acabaron.
+    """
+    token = tokens.tokens[tokens.index - 1] if tokens.index > start else tokens.peek()
+    _report(tokens, token[2] if token is not None else None, str(error))
+    if tokens.index > start and (token[0] == LBRACE or token[0] == RBRACE):
+        tokens.index -= 1  # La llave que causó el error se procesa normalmente
+    while True:
+        token = tokens.peek()
+        if token is None:
+            return None
+        if token[0] == SEMICOLON or token[0] == LBRACE:
+            tokens.advance()
+            return token[1]
+        if token[0] == RBRACE:
+            return '}'
+        tokens.advance()
+
+
+def parse_recovering(tokens):
+    """
+    Analiza todas las sentencias en el modo de recuperación y devuelve el AST
+    parcial; los diagnósticos quedan en `tokens.errors`. Los bloques if abiertos
+    se llevan en una pila, como en `parse_if_statement`, para poder retomar el
+    análisis dentro del bloque donde ocurrió el error.
+    """
+    ast = []
+    blocks = [(None, None, ast)]  # Tripletas (línea, condición, cuerpo); la primera es el programa
+
+    while True:
+        token = tokens.peek()
+        if token is None:
+            break
+        start = tokens.index
+        try:
+            if token[0] == RBRACE:
+                tokens.advance()  # Consumir '}'
+                if len(blocks) == 1:
+                    _report(tokens, token[2], f"Línea {token[2]}: '}}' sin un bloque abierto")
+                else:
+                    _close_block(blocks)
+            elif token[0] == KW_IF:
+                line, condition = parse_if_header(tokens)
+                blocks.append((line, condition, []))
+            else:
+                blocks[-1][2].append(parse_statement(tokens))
+        except SyntaxError as error:
+            stop = _synchronize(tokens, error, start)
+            if stop == '{':
+                blocks.append((token[2], _DISCARDED, []))
+            elif stop == '}' and len(blocks) == 1:
+                tokens.advance()  # Un '}' suelto tras el error forma parte de él
+
+    # Bloques sin cerrar al final de la entrada: se reportan y se cierran
+    while len(blocks) > 1:
+        line = blocks[-1][0]
+        _report(tokens, line, f"Línea {line}: Se esperaba '}}' para cerrar el bloque if")
+        _close_block(blocks)
+    return ast
+
 
-    return ('IF', condition, body)
+def _close_block(blocks):
+    _, condition, body = blocks.pop()
+    if condition is _DISCARDED:
+        return
+    blocks[-1][2].append(('IF', condition, body))
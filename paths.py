@@ -0,0 +1,28 @@
+import fnmatch
+import glob
+import os
+
+# === RUTAS DE ENTRADA ===
+# Expansión de los argumentos de las herramientas de línea de comandos
+# (analizador.py, xref.py, golden.py) en la lista de archivos a procesar.
+
+
+def expand_paths(paths, pattern='*'):
+    """
+    Convierte la lista de argumentos en rutas de archivos.
+    Acepta archivos, directorios (recorridos recursivamente, filtrando por
+    `pattern`) y patrones glob. Genera las rutas de forma perezosa.
+    """
+    for path in paths:
+        if glob.has_magic(path):
+            for match in sorted(glob.iglob(path, recursive=True)):
+                if os.path.isfile(match):
+                    yield match
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if fnmatch.fnmatch(name, pattern):
+                        yield os.path.join(root, name)
+        else:
+            yield path
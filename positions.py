@@ -0,0 +1,234 @@
+from bisect import bisect_left, bisect_right
+
+from lexer import LBRACE, LPAREN, NUMBER, RBRACE, RPAREN, SEMICOLON, lex_offsets, name_kinds
+from parser import parser
+
+# === POSICIONES EN LA FUENTE ===
+# El camino rápido solo guarda posiciones (desplazamientos en el texto): el
+# lexer de `lex_offsets` no cuenta saltos de línea y el parser no cambia.
+# - SourceIndex convierte una posición en (línea, columna) bajo demanda, con
+#   una tabla de las posiciones de los saltos de línea que se construye la
+#   primera vez que se consulta y una búsqueda binaria.
+# - Spans es una tabla aparte con el tramo [inicio, fin) de cada nodo del AST
+#   (sentencias, operaciones, variables y constantes), sin cambiar las tuplas.
+#   Los nodos se numeran en preorden; como los hijos aparecen en el orden del
+#   texto, los inicios quedan ordenados y `node_at` encuentra el nodo más
+#   interno que contiene una posición con una búsqueda binaria.
+#   El tramo de una expresión incluye los paréntesis que la encierran.
+
+
+class SourceIndex:
+    """
+    Índice perezoso de líneas de un texto. Las líneas y columnas empiezan en 1
+    (las líneas, en `line_number`).
+    """
+
+    def __init__(self, source_code, line_number=1):
+        self.source_code = source_code
+        self.line_number = line_number
+        self._newlines = None
+
+    @property
+    def newlines(self):
+        if self._newlines is None:
+            newlines = []
+            find = self.source_code.find
+            position = find('\n')
+            while position != -1:
+                newlines.append(position)
+                position = find('\n', position + 1)
+            self._newlines = newlines
+        return self._newlines
+
+    def line(self, offset):
+        return bisect_left(self.newlines, offset) + self.line_number
+
+    def location(self, offset):
+        """
+        Devuelve (línea, columna) de una posición del texto.
+        """
+        index = bisect_left(self.newlines, offset)
+        line_start = self.newlines[index - 1] + 1 if index else 0
+        return index + self.line_number, offset - line_start + 1
+
+    def offset(self, line, column):
+        """
+        Posición del texto que corresponde a (línea, columna).
+        """
+        index = line - self.line_number
+        line_start = self.newlines[index - 1] + 1 if index else 0
+        return line_start + column - 1
+
+
+# Clases de los tokens de un operando y de los que terminan una sentencia
+_OPERAND_KINDS = name_kinds | {NUMBER}
+_END_KINDS = frozenset((SEMICOLON, LBRACE, RBRACE))
+
+
+def with_lines(tokens, index):
+    """
+    Convierte tokens de `lex_offsets` en tokens con línea, como los de `lexer`.
+    """
+    return [(kind, value, index.line(start)) for kind, value, start in tokens]
+
+
+class Spans:
+    """
+    Tramos de todos los nodos de un AST analizado a partir de tokens de
+    `lex_offsets`. Para el nodo número i (en preorden): nodes[i] es el nodo,
+    starts[i] y ends[i] su tramo y parents[i] el número de su padre (-1 para
+    las sentencias del nivel superior).
+    """
+
+    def __init__(self, ast, tokens, index=None):
+        self.index = index
+        self.nodes = []
+        self.parents = []
+        self.starts = []
+        self.ends = []
+        self._numbers = None
+        self._align(ast, tokens)
+
+    def _align(self, ast, tokens):
+        """
+        Recorre el AST en preorden avanzando a la vez por los tokens: cada
+        variable o constante es el siguiente token IDENTIFIER o NUMBER, y cada
+        sentencia termina en su ';' o '}'. Después calcula, de los hijos hacia
+        los padres, el primer y último token de cada operación, incluidos los
+        paréntesis que la encierran.
+        """
+        nodes, parents = self.nodes, self.parents
+        first, last = [], []        # Primer y último token de cada nodo
+        expression = []             # Si cada nodo es una expresión
+
+        # Pares de paréntesis: índice del '(' -> índice de su ')'
+        matching = {}
+        opened = []
+        for position, token in enumerate(tokens):
+            if token[0] == LPAREN:
+                opened.append(position)
+            elif token[0] == RPAREN and opened:
+                matching[opened.pop()] = position
+
+        def add(node, parent, is_expression, token=-1):
+            nodes.append(node)
+            parents.append(parent)
+            first.append(token)
+            last.append(token)
+            expression.append(is_expression)
+            return len(nodes) - 1
+
+        cursor = 0
+        stack = [('statement', statement, -1) for statement in reversed(ast)]
+        while stack:
+            action, node, parent = stack.pop()
+
+            if action == 'statement':
+                number = add(node, parent, False, cursor)
+                kind = node[0]
+                stack.append(('end', None, number))
+                if kind == 'IF':
+                    matching.pop(cursor + 1, None)  # Los paréntesis del if no son de la condición
+                    cursor += 2  # 'if' '('
+                    stack.extend(('statement', statement, number) for statement in reversed(node[2]))
+                    stack.append(('open', None, number))
+                    stack.append(('expression', node[1], number))
+                elif kind == 'ASSIGNMENT':
+                    cursor += 2  # nombre '='
+                    stack.append(('expression', node[2], number))
+                elif len(node) > 3:
+                    cursor += 3  # tipo nombre '='
+                    stack.append(('expression', node[3], number))
+                else:
+                    cursor += 2  # tipo nombre
+
+            elif action == 'expression':
+                if isinstance(node, tuple):
+                    number = add(node, parent, True)
+                    stack.append(('expression', node[2], number))
+                    stack.append(('expression', node[1], number))
+                    continue
+                while tokens[cursor][0] not in _OPERAND_KINDS:
+                    cursor += 1  # '(' antes del operando u operador
+                add(node, parent, True, cursor)
+                cursor += 1
+
+            elif action == 'open':
+                while tokens[cursor][0] != LBRACE:
+                    cursor += 1  # ')' de la condición
+                cursor += 1
+
+            else:  # 'end': ';' de una declaración o asignación, '}' de un if
+                while tokens[cursor][0] not in _END_KINDS:
+                    cursor += 1  # ')' al final de la expresión
+                last[parent] = cursor
+                cursor += 1
+
+        # Expresiones: tokens de los operandos más los paréntesis que las encierran
+        for number in range(len(nodes) - 1, -1, -1):
+            if not expression[number]:
+                continue
+            while matching.get(first[number] - 1, -1) == last[number] + 1:
+                first[number] -= 1
+                last[number] += 1
+            parent = parents[number]
+            if expression[parent]:
+                if first[parent] < 0 or first[number] < first[parent]:
+                    first[parent] = first[number]
+                last[parent] = max(last[parent], last[number])
+
+        self.starts = [tokens[token][2] for token in first]
+        self.ends = [tokens[token][2] + len(tokens[token][1]) for token in last]
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def span(self, number):
+        return self.starts[number], self.ends[number]
+
+    def number_of(self, node):
+        """
+        Número de una sentencia u operación (las tuplas del AST son únicas).
+        """
+        if self._numbers is None:
+            self._numbers = {id(node): number for number, node in enumerate(self.nodes)
+                             if isinstance(node, tuple)}
+        return self._numbers[id(node)]
+
+    def node_at(self, offset):
+        """
+        Número del nodo más interno cuyo tramo contiene `offset`, o None.
+        """
+        number = bisect_right(self.starts, offset) - 1
+        while number >= 0 and self.ends[number] <= offset:
+            number = self.parents[number]
+        return number if number >= 0 else None
+
+    def line(self, number):
+        """
+        Línea donde empieza un nodo.
+        """
+        return self.index.line(self.starts[number])
+
+    def location(self, number):
+        """
+        ((línea, columna) de inicio, (línea, columna) de fin) de un nodo.
+        """
+        start, end = self.span(number)
+        return self.index.location(start), self.index.location(end)
+
+
+def parse_with_spans(source_code):
+    """
+    Analiza un texto y devuelve (ast, spans). Los errores se lanzan con la
+    línea correcta: solo en ese caso se calculan las líneas de los tokens.
+    """
+    index = SourceIndex(source_code)
+    tokens = lex_offsets(source_code)
+    try:
+        ast = parser(tokens)
+    except SyntaxError:
+        # Repetir el análisis con líneas para que el mensaje sea el de siempre
+        parser(with_lines(tokens, index))
+        raise
+    return ast, Spans(ast, tokens, index)
@@ -0,0 +1,221 @@
+import sys
+import time
+from collections import Counter
+
+from lexer import lexer, token_definitions, token_regex
+from parser import parser
+
+# === PERFILADO POR FASES ===
+# Instrumentación opcional: el lexer y el parser no cambian y no pagan nada
+# cuando no se perfila. Con un objeto Stats se mide cada fase (tiempo real,
+# tiempo de CPU y bloques de memoria retenidos) y, al terminar, se cuentan los
+# tokens por tipo, los intentos de la alternancia de `token_regex` por tipo,
+# las sentencias por clase y la profundidad máxima de las expresiones. Estos
+# conteos salen de un recorrido aparte (fuera de las fases medidas), no de
+# contadores en los bucles del lexer y del parser.
+#
+# Uso de un solo archivo con volcados de cProfile y tracemalloc:
+#   python profiling.py archivo [--cprofile salida.prof] [--tracemalloc salida.snap]
+
+# Orden de prueba de cada tipo de token en la alternancia de `token_regex`
+_ALTERNATIVES = [name for name, _ in token_definitions]
+
+
+class _Phase:
+    """
+    Administrador de contexto que suma una medición a la fase de un Stats.
+    """
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        blocks = sys.getallocatedblocks() - self.blocks
+        phase = self.stats.phases.setdefault(self.name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'blocks': 0})
+        phase['calls'] += 1
+        phase['wall'] += wall
+        phase['cpu'] += cpu
+        phase['blocks'] += blocks
+        return False
+
+
+class Stats:
+    """
+    Estadísticas acumuladas de uno o varios análisis.
+    - phases: {fase: {'calls', 'wall', 'cpu', 'blocks'}}; `blocks` es el cambio
+      en los bloques de memoria vivos (objetos que la fase dejó reservados).
+    - tokens: coincidencias de `token_regex` por tipo, incluidos los espacios
+      y comentarios que el lexer descarta.
+    - regex_attempts: alternativas de `token_regex` probadas por tipo. La
+      alternancia prueba los tipos en el orden de `token_definitions`, así que
+      un token de un tipo cuesta un intento en ese tipo y en cada anterior.
+    - statements: sentencias por clase (DECLARATION, ASSIGNMENT, IF).
+    - max_expression_depth: mayor profundidad de una expresión.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.tokens = Counter()
+        self.regex_attempts = Counter()
+        self.statements = Counter()
+        self.max_expression_depth = 0
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def count_tokens(self, source_code):
+        """
+        Vuelve a recorrer el texto con `token_regex` para contar los tokens de
+        cada tipo (también los descartados) y los intentos de la alternancia.
+        """
+        counts = Counter(match.lastgroup for match in token_regex.finditer(source_code))
+        self.tokens.update(counts)
+        for index, name in enumerate(_ALTERNATIVES):
+            attempts = sum(counts[later] for later in _ALTERNATIVES[index:])
+            if attempts:
+                self.regex_attempts[name] += attempts
+
+    def count_ast(self, ast):
+        """
+        Cuenta las sentencias por clase y la profundidad de las expresiones.
+        """
+        expressions = []
+        stack = list(ast)
+        while stack:
+            statement = stack.pop()
+            kind = statement[0]
+            self.statements[kind] += 1
+            if kind == 'IF':
+                expressions.append(statement[1])
+                stack.extend(statement[2])
+            elif kind == 'ASSIGNMENT' or len(statement) > 3:
+                expressions.append(statement[-1])
+
+        deepest = self.max_expression_depth
+        for expression in expressions:
+            nodes = [(expression, 0)]
+            while nodes:
+                node, depth = nodes.pop()
+                if isinstance(node, tuple):
+                    depth += 1
+                    nodes.append((node[1], depth))
+                    nodes.append((node[2], depth))
+                deepest = max(deepest, depth)
+        self.max_expression_depth = deepest
+
+    def merge(self, other):
+        """
+        Suma a estas estadísticas las de otro Stats o de su diccionario.
+        """
+        other = other if isinstance(other, Stats) else Stats.from_dict(other)
+        for name, phase in other.phases.items():
+            mine = self.phases.setdefault(name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'blocks': 0})
+            for key, value in phase.items():
+                mine[key] += value
+        self.tokens.update(other.tokens)
+        self.regex_attempts.update(other.regex_attempts)
+        self.statements.update(other.statements)
+        self.max_expression_depth = max(self.max_expression_depth, other.max_expression_depth)
+        return self
+
+    def to_dict(self):
+        return {
+            'phases': {name: dict(phase) for name, phase in self.phases.items()},
+            'tokens': dict(self.tokens),
+            'regex_attempts': dict(self.regex_attempts),
+            'statements': dict(self.statements),
+            'max_expression_depth': self.max_expression_depth,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.phases = {name: dict(phase) for name, phase in data['phases'].items()}
+        stats.tokens.update(data['tokens'])
+        stats.regex_attempts.update(data['regex_attempts'])
+        stats.statements.update(data['statements'])
+        stats.max_expression_depth = data['max_expression_depth']
+        return stats
+
+    def report(self):
+        """
+        Texto legible con el resumen de las estadísticas.
+        """
+        lines = []
+        for name, phase in self.phases.items():
+            lines.append(f"{name:>8}: {phase['wall']:.4f} s reales, {phase['cpu']:.4f} s de CPU, "
+                         f"{phase['calls']} llamadas, {phase['blocks']:+,} bloques")
+        if self.tokens:
+            lines.append("  tokens: " + ', '.join(f"{name} {count:,}" for name, count in self.tokens.most_common()))
+            lines.append("  intentos de regex: " + ', '.join(
+                f"{name} {self.regex_attempts[name]:,}" for name in _ALTERNATIVES if self.regex_attempts[name]))
+        if self.statements:
+            lines.append("  sentencias: " + ', '.join(f"{kind} {count:,}" for kind, count in self.statements.most_common()))
+            lines.append(f"  profundidad máxima de expresión: {self.max_expression_depth}")
+        return '\n'.join(lines)
+
+
+def profile_source(source_code, stats=None):
+    """
+    Ejecuta lexer y parser midiendo cada fase. Devuelve (tokens, ast, stats).
+    """
+    stats = stats if stats is not None else Stats()
+    with stats.phase('lexer'):
+        tokens = lexer(source_code)
+    stats.count_tokens(source_code)
+    with stats.phase('parser'):
+        ast = parser(tokens)
+    stats.count_ast(ast)
+    return tokens, ast, stats
+
+
+def profile_file(path, cprofile_output=None, tracemalloc_output=None):
+    """
+    Perfila un archivo. Si se indican, guarda las estadísticas de cProfile
+    (legibles con `pstats`) y una instantánea de tracemalloc (legible con
+    `tracemalloc.Snapshot.load`) tomada con el AST todavía en memoria.
+    """
+    with open(path, encoding='utf-8') as file:
+        source_code = file.read()
+
+    profiler = None
+    if cprofile_output:
+        import cProfile
+        profiler = cProfile.Profile()
+    if tracemalloc_output:
+        import tracemalloc
+        tracemalloc.start()
+
+    stats = Stats()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        tokens, ast, _ = profile_source(source_code, stats)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile_output)
+        if tracemalloc_output:
+            tracemalloc.take_snapshot().dump(tracemalloc_output)
+            tracemalloc.stop()
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arguments = argparse.ArgumentParser(description='Perfila el análisis de un archivo.')
+    arguments.add_argument('path', help='archivo fuente')
+    arguments.add_argument('--cprofile', metavar='ARCHIVO', help='guarda las estadísticas de cProfile')
+    arguments.add_argument('--tracemalloc', metavar='ARCHIVO', help='guarda una instantánea de tracemalloc')
+    options = arguments.parse_args()
+    print(profile_file(options.path, options.cprofile, options.tracemalloc).report())
@@ -0,0 +1,259 @@
+from functools import partial
+
+from evaluator import binary_operations, declared_types
+from positions import parse_with_spans
+from treewalk import Blocks, postorder
+
+# === ANÁLISIS SEMÁNTICO ===
+# Una sola pasada lineal sobre el AST de `parser` que:
+# - Construye una tabla de símbolos con ámbitos: el cuerpo de cada if es un
+#   bloque anidado y sus declaraciones solo son visibles dentro de él.
+# - Reporta usos de variables no declaradas, redeclaraciones (también las que
+#   ocultan una variable visible de un bloque exterior) y asignaciones de un
+#   valor float a una variable int (el valor se truncaría).
+# - Asigna a cada variable un número de casilla (slot) denso, 0, 1, 2... y
+#   devuelve el programa con cada identificador sustituido por su casilla, para
+#   ejecutarlo sobre una lista en lugar de un diccionario.
+#
+# Las casillas son por nombre, como las variables de `evaluator.evaluate`, así
+# que el programa resuelto conserva la semántica incluso si tiene diagnósticos.
+# Forma del programa resuelto:
+#   ('DECLARATION', tipo, casilla[, expr]), ('ASSIGNMENT', casilla, expr),
+#   ('IF', expr, [sentencias]); en las expresiones, ('VAR', casilla) es una
+#   variable y los números siguen siendo constantes.
+
+
+class Symbol:
+    """
+    Declaración de una variable: nombre, tipo ('int', 'float' o None si es una
+    entrada), casilla, línea de la declaración y profundidad del bloque.
+    """
+    __slots__ = ('name', 'type', 'slot', 'line', 'depth')
+
+    def __init__(self, name, type_name, slot, line, depth):
+        self.name = name
+        self.type = type_name
+        self.slot = slot
+        self.line = line
+        self.depth = depth
+
+    def __repr__(self):
+        return f"Symbol({self.name!r}, {self.type!r}, slot={self.slot}, line={self.line}, depth={self.depth})"
+
+
+class Analysis:
+    """
+    Resultado del análisis: programa resuelto, símbolos declarados (en orden),
+    nombre de cada casilla y diagnósticos.
+    """
+
+    def __init__(self):
+        self.program = []
+        self.symbols = []
+        self.names = []          # Casilla -> nombre
+        self.slots = {}          # Nombre -> casilla
+        self.diagnostics = []
+
+    def slot(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+        return slot
+
+    def report(self, kind, line, name, message):
+        self.diagnostics.append({'kind': kind, 'line': line, 'name': name, 'message': message})
+
+    @property
+    def ok(self):
+        return not self.diagnostics
+
+
+def _combine(op, left, right):
+    """
+    Tipo del resultado de una operación ('int', 'float' o None si no se conoce).
+    """
+    if op == '==':
+        return 'int'
+    if left == 'float' or right == 'float':
+        return 'float'
+    if left == 'int' and right == 'int':
+        return 'int'
+    return None
+
+
+def analyze(ast, spans=None, inputs=()):
+    """
+    Analiza el AST. `spans` son los tramos del AST (positions.Spans, de
+    `positions.parse_with_spans`) de donde salen las líneas de los diagnósticos
+    (sin ellos, las líneas son None) e `inputs` son los nombres de las
+    variables de entrada, que no se reportan como no declaradas. Devuelve un Analysis.
+    """
+    result = Analysis()
+
+    # Declaraciones visibles de cada nombre (la última es la más interna), y
+    # nombres declarados en cada bloque abierto para retirarlos al cerrarlo.
+    # Así cada búsqueda cuesta O(1) sin importar el anidamiento.
+    visible = {}
+    for name in inputs:
+        symbol = Symbol(name, None, result.slot(name), None, 0)
+        visible[name] = [symbol]
+
+    def lookup(name, line):
+        declarations = visible.get(name)
+        if declarations:
+            return declarations[-1]
+        result.report('undeclared', line, name, f"Variable no declarada: {name}")
+        return None
+
+    def expression(node, line):
+        """
+        Devuelve (expresión resuelta, tipo).
+        """
+        results = []
+        for current in postorder(node):
+            if isinstance(current, str):
+                symbol = lookup(current, line)
+                results.append((('VAR', result.slot(current)), symbol.type if symbol else None))
+                continue
+            if not isinstance(current, tuple):
+                results.append((current, 'int' if isinstance(current, int) else 'float'))
+                continue
+            (right, right_type), (left, left_type) = results.pop(), results.pop()
+            results.append(((current[0], left, right), _combine(current[0], left_type, right_type)))
+        return results[-1]
+
+    def check_store(symbol, value_type, line):
+        if symbol is not None and symbol.type == 'int' and value_type == 'float':
+            result.report('type_mismatch', line, symbol.name,
+                          f"Se asigna un valor float a la variable int {symbol.name}")
+
+    def close(declared, parent, node):
+        # Al cerrar el cuerpo de un if: retira sus declaraciones y añade el nodo IF
+        for name in declared:
+            visible[name].pop()
+        parent.append(node)
+
+    # Estado de cada bloque: (lista de salida, nombres declarados en él)
+    blocks = Blocks(ast, (result.program, []))
+    for statement, (out, declared) in blocks:
+        line = spans.line(spans.number_of(statement)) if spans is not None else None
+        kind = statement[0]
+        depth = blocks.depth
+
+        if kind == 'DECLARATION':
+            _, type_name, name = statement[:3]
+            if type_name not in declared_types:
+                raise ValueError(f"Tipo desconocido: {type_name}")
+            node = ('DECLARATION', type_name, result.slot(name))
+            if len(statement) > 3:
+                value, value_type = expression(statement[3], line)
+                node += (value,)
+            previous = visible.get(name)
+            if previous:
+                where = f"línea {previous[-1].line}" if previous[-1].line is not None else "una entrada"
+                result.report('redeclared', line, name, f"Variable ya declarada ({where}): {name}")
+            symbol = Symbol(name, type_name, result.slot(name), line, depth)
+            if len(statement) > 3:
+                check_store(symbol, value_type, line)
+            result.symbols.append(symbol)
+            visible.setdefault(name, []).append(symbol)
+            declared.append(name)
+            out.append(node)
+
+        elif kind == 'ASSIGNMENT':
+            _, name, expr = statement
+            value, value_type = expression(expr, line)
+            check_store(lookup(name, line), value_type, line)
+            out.append(('ASSIGNMENT', result.slot(name), value))
+
+        elif kind == 'IF':
+            condition, _ = expression(statement[1], line)
+            body, inner = [], []
+            blocks.enter(statement[2], (body, inner), partial(close, inner, out, ('IF', condition, body)))
+
+        else:
+            raise ValueError(f"Sentencia desconocida: {kind}")
+
+    return result
+
+
+def analyze_source(source_code, inputs=()):
+    """
+    Analiza un código fuente con números de línea en los diagnósticos.
+    """
+    ast, spans = parse_with_spans(source_code)
+    return analyze(ast, spans, inputs)
+
+
+def evaluate_slots(analysis, inputs=None):
+    """
+    Ejecuta el programa resuelto guardando las variables en una lista indexada
+    por casilla. Devuelve el diccionario final de variables, igual que
+    `evaluator.evaluate`.
+    """
+    unset = object()
+    values = [unset] * len(analysis.names)
+    types = [None] * len(analysis.names)
+    extra = {}
+    for name, value in (inputs or {}).items():
+        slot = analysis.slots.get(name)
+        if slot is None:
+            extra[name] = value
+        else:
+            values[slot] = value
+
+    blocks = Blocks(analysis.program)
+    for statement, _ in blocks:
+        kind = statement[0]
+        if kind == 'DECLARATION':
+            convert = declared_types[statement[1]]
+            value = _evaluate(statement[3], values, unset, analysis.names) if len(statement) > 3 else 0
+            types[statement[2]] = convert
+            values[statement[2]] = convert(value)
+        elif kind == 'ASSIGNMENT':
+            value = _evaluate(statement[2], values, unset, analysis.names)
+            convert = types[statement[1]]
+            values[statement[1]] = convert(value) if convert else value
+        elif _evaluate(statement[1], values, unset, analysis.names) != 0:
+            blocks.enter(statement[2])
+
+    extra.update((name, value) for name, value in zip(analysis.names, values) if value is not unset)
+    return extra
+
+
+def _is_variable(node):
+    return node[0] == 'VAR'
+
+
+def _evaluate(node, values, unset, names):
+    """
+    Calcula una expresión resuelta.
+    """
+    results = []
+    for current in postorder(node, _is_variable):
+        if not isinstance(current, tuple):
+            results.append(current)
+            continue
+        if current[0] == 'VAR':
+            value = values[current[1]]
+            if value is unset:
+                raise NameError(f"Variable sin valor: {names[current[1]]}")
+            results.append(value)
+            continue
+        right, left = results.pop(), results.pop()
+        results.append(binary_operations[current[0]](left, right))
+    return results[-1]
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python semantic.py archivo [entradas...]
+    with open(sys.argv[1], encoding='utf-8') as file:
+        analysis = analyze_source(file.read(), inputs=sys.argv[2:])
+    for diagnostic in analysis.diagnostics:
+        print(f"Línea {diagnostic['line']}: {diagnostic['message']}")
+    print(f"{len(analysis.symbols)} declaraciones, {len(analysis.names)} casillas, "
+          f"{len(analysis.diagnostics)} diagnósticos")
+    sys.exit(1 if analysis.diagnostics else 0)
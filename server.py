@@ -0,0 +1,496 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from compiler import compile_program
+from lexer import LexerError, TypeView, lexer
+from parser import parser
+
+# === SERVIDOR DE ANÁLISIS (asyncio) ===
+# Proceso de larga duración que atiende peticiones JSON-RPC 2.0, una por línea,
+# por un socket Unix o por stdin/stdout. Evita pagar el arranque de Python y la
+# importación de los módulos en cada análisis, y conserva el estado caliente:
+# la expresión del lexer ya compilada, los AST recientes y las funciones
+# compiladas de `compile_program`.
+#
+# Métodos: lex, parse, evaluate (parámetros: source, y opcionalmente inputs
+# para evaluate y recover para parse) y stats. Las notificaciones (sin 'id') no
+# reciben respuesta, y los float no finitos del resultado se envían como texto
+# ('inf', '-inf', 'nan') porque JSON no los admite como números.
+#
+# El trabajo de CPU se hace en un grupo de procesos. Las peticiones pequeñas se
+# agrupan en lotes (hasta BATCH_SIZE, esperando como mucho BATCH_DELAY) y cada
+# lote viaja al grupo como una sola tarea, así que el costo de comunicación
+# entre procesos se reparte entre todas.
+#
+# Uso:
+#   python server.py serve --socket /tmp/analizador.sock [-j N]
+#   python server.py serve --stdio
+#   python server.py load --socket /tmp/analizador.sock [--requests N] [--concurrency C]
+
+# Fuentes con menos caracteres que esto se agrupan en lotes
+SMALL_SOURCE = 4096
+# Peticiones por lote y espera máxima (segundos) para completar un lote
+BATCH_SIZE = 64
+BATCH_DELAY = 0.002
+# Latencias recientes que se conservan para calcular los percentiles
+LATENCY_WINDOW = 10000
+# AST recientes que conserva cada proceso de trabajo
+MAX_PARSED = 1024
+
+# Códigos de error de JSON-RPC
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+ANALYSIS_ERROR = -32000
+
+
+# === TRABAJO EN LOS PROCESOS ===
+
+# AST ya analizados por este proceso, del menos al más recientemente usado
+_parsed = OrderedDict()
+
+
+class RequestError(Exception):
+    """
+    Error que se devuelve al cliente como respuesta JSON-RPC con `code`.
+    """
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def _to_json(node):
+    """
+    Convierte el AST (tuplas y listas anidadas) a listas para JSON, sin recursividad.
+    """
+    root = []
+    stack = [(node, root)]
+    while stack:
+        current, out = stack.pop()
+        for item in current:
+            if isinstance(item, (tuple, list)):
+                child = []
+                out.append(child)
+                stack.append((item, child))
+            else:
+                out.append(item)
+    return root
+
+
+def _finite(value):
+    """
+    Copia de un resultado con los float no finitos (inf, -inf, nan) como texto,
+    porque JSON no tiene números para ellos. Sin recursividad, como `_to_json`.
+    """
+    root = [value]
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        for key, item in (current.items() if isinstance(current, dict) else enumerate(current)):
+            if isinstance(item, float) and not math.isfinite(item):
+                current[key] = repr(item)
+            elif isinstance(item, (list, dict)):
+                current[key] = item = dict(item) if isinstance(item, dict) else list(item)
+                stack.append(item)
+    return root[0]
+
+
+def _parse(source_code):
+    ast = _parsed.get(source_code)
+    if ast is not None:
+        _parsed.move_to_end(source_code)
+        return ast
+    ast = parser(lexer(source_code))
+    _parsed[source_code] = ast
+    if len(_parsed) > MAX_PARSED:
+        _parsed.popitem(last=False)
+    return ast
+
+
+def handle(method, params):
+    """
+    Ejecuta un método y devuelve su resultado. Los errores del análisis se
+    lanzan como RequestError.
+    """
+    if method not in ('lex', 'parse', 'evaluate'):
+        raise RequestError(METHOD_NOT_FOUND, f"Método desconocido: {method}")
+    if not isinstance(params, dict) or not isinstance(params.get('source'), str):
+        raise RequestError(INVALID_PARAMS, "Se esperaba el parámetro 'source' (texto)")
+    source_code = params['source']
+    try:
+        if method == 'lex':
+            return [list(token) for token in TypeView(lexer(source_code))]
+        if method == 'parse':
+            if params.get('recover'):
+                errors = []
+                ast = parser(lexer(source_code, errors=errors), errors=errors)
+                return {'ast': _to_json(ast), 'errors': errors}
+            return {'ast': _to_json(_parse(source_code)), 'errors': []}
+        program = compile_program(_parse(source_code))
+        return program(params.get('inputs') or {})
+    except (SyntaxError, LexerError) as error:
+        raise RequestError(ANALYSIS_ERROR, str(error)) from None
+    except (ArithmeticError, NameError, TypeError, ValueError) as error:
+        raise RequestError(ANALYSIS_ERROR, f"{type(error).__name__}: {error}") from None
+
+
+def handle_batch(requests):
+    """
+    Ejecuta una lista de (método, parámetros). Devuelve una lista de pares
+    (resultado, None) o (None, (código, mensaje)) en el mismo orden.
+    """
+    results = []
+    for method, params in requests:
+        try:
+            results.append((handle(method, params), None))
+        except RequestError as error:
+            results.append((None, (error.code, str(error))))
+    return results
+
+
+# === SERVIDOR ===
+
+def percentiles(values, points=(50, 90, 99)):
+    """
+    Percentiles (método del rango más cercano) de una lista de valores.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {f'p{point}': None for point in points}
+    return {f'p{point}': ordered[min(len(ordered) - 1, max(0, -(-point * len(ordered) // 100) - 1))]
+            for point in points}
+
+
+class AnalysisServer:
+    """
+    Atiende conexiones, agrupa las peticiones pequeñas y mide la latencia de
+    cada petición (desde que se lee hasta que se escribe la respuesta).
+    """
+
+    def __init__(self, workers=None, batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY):
+        # Sin procesos (workers=0) el trabajo se hace en el hilo del servidor
+        self.executor = ProcessPoolExecutor(max_workers=workers) if workers != 0 else None
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.pending = []            # Peticiones pequeñas esperando lote: (método, parámetros, futuro)
+        self.flush_handle = None
+        self.batches = set()         # Lotes en curso (referencias para que no se pierdan)
+        self.latencies = {}          # Método -> deque de latencias en segundos
+        self.counts = {'requests': 0, 'errors': 0, 'batches': 0, 'batched_requests': 0}
+
+    async def _run(self, function, argument):
+        if self.executor is None:
+            return function(*argument)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *argument)
+
+    def _flush(self):
+        """
+        Envía las peticiones pendientes al grupo de procesos como un lote.
+        """
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if batch:
+            self.counts['batches'] += 1
+            self.counts['batched_requests'] += len(batch)
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self.batches.add(task)
+            task.add_done_callback(self.batches.discard)
+
+    async def _run_batch(self, batch):
+        try:
+            results = await self._run(handle_batch, ([(method, params) for method, params, _ in batch],))
+        except Exception as error:  # El proceso de trabajo falló: se informa a todo el lote
+            results = [(None, (ANALYSIS_ERROR, f"{type(error).__name__}: {error}"))] * len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def execute(self, method, params):
+        """
+        Ejecuta un método y devuelve (resultado, error).
+        """
+        if method == 'stats':
+            return self.stats(), None
+        source_code = params.get('source') if isinstance(params, dict) else None
+        if isinstance(source_code, str) and len(source_code) < SMALL_SOURCE:
+            future = asyncio.get_running_loop().create_future()
+            self.pending.append((method, params, future))
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+            elif self.flush_handle is None:
+                self.flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self._flush)
+            return await future
+        try:
+            return (await self._run(handle_batch, ([(method, params)],)))[0]
+        except Exception as error:  # El proceso de trabajo falló, como en `_run_batch`
+            return None, (ANALYSIS_ERROR, f"{type(error).__name__}: {error}")
+
+    async def respond(self, line, write):
+        """
+        Atiende una línea de la entrada y escribe su respuesta; las
+        notificaciones (peticiones sin 'id') se ejecutan sin responder.
+        """
+        start = time.perf_counter()
+        request_id = None
+        method = None
+        notification = False
+        try:
+            request = json.loads(line)
+        except ValueError:
+            result, error = None, (PARSE_ERROR, "JSON inválido")
+        else:
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                result, error = None, (INVALID_REQUEST, "Petición inválida")
+            else:
+                request_id = request.get('id')
+                notification = 'id' not in request
+                method = request['method']
+                result, error = await self.execute(method, request.get('params', {}))
+
+        response = {'jsonrpc': '2.0', 'id': request_id}
+        if error is None:
+            response['result'] = result
+        else:
+            response['error'] = {'code': error[0], 'message': error[1]}
+            self.counts['errors'] += 1
+        if not notification:
+            try:
+                text = json.dumps(response, ensure_ascii=False, allow_nan=False)
+            except ValueError:
+                response['result'] = _finite(result)
+                text = json.dumps(response, ensure_ascii=False, allow_nan=False)
+            await write(text + '\n')
+
+        self.counts['requests'] += 1
+        latencies = self.latencies.get(method or 'invalid')
+        if latencies is None:
+            latencies = self.latencies[method or 'invalid'] = deque(maxlen=LATENCY_WINDOW)
+        latencies.append(time.perf_counter() - start)
+
+    async def serve_stream(self, reader, write):
+        """
+        Lee peticiones de `reader` hasta que se cierra y atiende cada una en su
+        propia tarea, así que las respuestas pueden llegar en otro orden.
+        """
+        tasks = set()
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.ensure_future(self.respond(line, write))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def handle_connection(self, reader, writer):
+        lock = asyncio.Lock()
+
+        async def write(text):
+            async with lock:
+                writer.write(text.encode())
+                await writer.drain()
+
+        try:
+            await self.serve_stream(reader, write)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def stats(self):
+        """
+        Contadores y percentiles de latencia (en milisegundos) por método.
+        """
+        latency = {}
+        for method, values in self.latencies.items():
+            latency[method] = {'count': len(values),
+                               **{name: value * 1000 if value is not None else None
+                                  for name, value in percentiles(values).items()}}
+        return {**self.counts, 'latency_ms': latency}
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+async def serve_socket(path, workers=None):
+    server = AnalysisServer(workers)
+    if os.path.exists(path):
+        os.remove(path)
+    unix_server = await asyncio.start_unix_server(server.handle_connection, path)
+    print(f"Escuchando en {path}", file=sys.stderr)
+    try:
+        async with unix_server:
+            await unix_server.serve_forever()
+    finally:
+        server.close()
+
+
+class _StdinReader:
+    """
+    Lector de stdin con la interfaz de StreamReader que necesita serve_stream.
+    Lee en un hilo aparte porque stdin puede ser un archivo, que asyncio no
+    sabe leer sin bloquear.
+    """
+
+    async def readline(self):
+        return await asyncio.to_thread(sys.stdin.buffer.readline)
+
+
+async def serve_stdio(workers=None):
+    server = AnalysisServer(workers)
+
+    async def write(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    try:
+        await server.serve_stream(_StdinReader(), write)
+    finally:
+        server.close()
+
+
+# === CLIENTE DE PRUEBA DE CARGA ===
+
+class Client:
+    """
+    Cliente JSON-RPC sobre un socket Unix que permite varias peticiones en
+    curso a la vez: las respuestas se asocian a su petición por el id.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.waiting = {}
+        self.listener = asyncio.ensure_future(self._listen())
+
+    @classmethod
+    async def connect(cls, path):
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.waiting.pop(response.get('id'), None)
+            if future is not None:
+                future.set_result(response)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError("El servidor cerró la conexión"))
+
+    async def call(self, method, **params):
+        """
+        Envía una petición y devuelve la respuesta completa (con 'result' o 'error').
+        """
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        request = {'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params}
+        self.writer.write((json.dumps(request) + '\n').encode())
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.cancel()
+
+
+# Programas de la prueba de carga: pequeños, con y sin errores
+LOAD_SOURCES = [
+    ('lex', {'source': 'int a = 10;\nfloat b = a / 4.0;'}),
+    ('parse', {'source': 'int a = 10;\nif (a == 10) { b = a * (a + 1); }'}),
+    ('evaluate', {'source': 'int x = a + 1;\nif (x == 2) { y = x * 3; }', 'inputs': {'a': 1}}),
+    ('parse', {'source': 'x = (1 + ;', 'recover': True}),
+    ('evaluate', {'source': 'x = 1 / 0;'}),
+]
+
+
+async def load_test(path, requests=2000, concurrency=50):
+    """
+    Envía `requests` peticiones repartidas entre `concurrency` conexiones
+    concurrentes y devuelve la latencia vista por el cliente, las peticiones
+    por segundo y las estadísticas del servidor.
+    """
+    clients = [await Client.connect(path) for _ in range(concurrency)]
+    latencies = []
+    failures = 0
+
+    async def worker(client, count, offset):
+        nonlocal failures
+        for index in range(count):
+            method, params = LOAD_SOURCES[(offset + index) % len(LOAD_SOURCES)]
+            start = time.perf_counter()
+            response = await client.call(method, **params)
+            latencies.append(time.perf_counter() - start)
+            if 'result' not in response and 'error' not in response:
+                failures += 1
+
+    start = time.perf_counter()
+    share, extra = divmod(requests, concurrency)
+    await asyncio.gather(*(worker(client, share + (index < extra), index)
+                           for index, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+
+    server_stats = (await clients[0].call('stats'))['result']
+    for client in clients:
+        await client.close()
+    return {
+        'requests': len(latencies),
+        'failures': failures,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': {name: value * 1000 for name, value in percentiles(latencies).items()},
+        'server': server_stats,
+    }
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(prog='server', description='Servidor de análisis JSON-RPC.')
+    commands = arguments.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help='inicia el servidor')
+    where = serve.add_mutually_exclusive_group(required=True)
+    where.add_argument('--socket', metavar='RUTA', help='ruta del socket Unix')
+    where.add_argument('--stdio', action='store_true', help='atiende por stdin/stdout')
+    serve.add_argument('-j', '--workers', type=int, default=None,
+                       help='procesos de trabajo (0: en el proceso del servidor)')
+    load = commands.add_parser('load', help='prueba de carga contra un servidor')
+    load.add_argument('--socket', metavar='RUTA', required=True, help='ruta del socket Unix')
+    load.add_argument('--requests', type=int, default=2000, help='peticiones en total')
+    load.add_argument('--concurrency', type=int, default=50, help='conexiones concurrentes')
+    options = arguments.parse_args(argv)
+
+    if options.command == 'load':
+        result = asyncio.run(load_test(options.socket, options.requests, options.concurrency))
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return 1 if result['failures'] else 0
+
+    try:
+        if options.stdio:
+            asyncio.run(serve_stdio(options.workers))
+        else:
+            asyncio.run(serve_socket(options.socket, options.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+from array import array
+
+from lexer import LexerError, kind_values, type_kinds, token_regex
+
+# === ALMACÉN COMPACTO DE TOKENS ===
+# En lugar de una tupla (clase, valor, línea) por token, se guardan columnas en
+# arreglos tipados: la clase en un byte y el inicio, fin y línea en enteros de
+# 32 bits. El valor de cada token no se copia: se obtiene del texto fuente solo
+# cuando se pide.
+
+
+class TokenStore:
+    """
+    Secuencia compacta de tokens respaldada por el texto fuente.
+    Se comporta como la lista de tuplas que devuelve `lexer` (indexado, len,
+    iteración, comparación), así que puede pasarse directamente a `parser`.
+    """
+
+    __slots__ = ('source', 'kinds', 'starts', 'ends', 'lines')
+
+    def __init__(self, source_code):
+        self.source = source_code
+        self.kinds = array('B')     # Clase de cada token
+        self.starts = array('I')    # Posición de inicio en la fuente
+        self.ends = array('I')      # Posición final (exclusiva)
+        self.lines = array('I')     # Línea del token
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return (
+            self.kinds[index],
+            self.source[self.starts[index]:self.ends[index]],
+            self.lines[index],
+        )
+
+    def __iter__(self):
+        source = self.source
+        for kind, start, end, line in zip(self.kinds, self.starts, self.ends, self.lines):
+            yield (kind, source[start:end], line)
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenStore, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def kind(self, index):
+        """
+        Clase del token, sin construir la tupla completa.
+        """
+        return self.kinds[index]
+
+    def value(self, index):
+        """
+        Texto del token, extraído de la fuente en el momento de pedirlo.
+        """
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def nbytes(self):
+        """
+        Memoria ocupada por las columnas (sin contar el texto fuente).
+        """
+        return sum(column.itemsize * len(column) for column in (self.kinds, self.starts, self.ends, self.lines))
+
+
+def lex_compact(source_code):
+    """
+    Analizador léxico que devuelve un TokenStore en lugar de una lista de tuplas.
+    Produce los mismos tokens y errores que `lexer`.
+    """
+    store = TokenStore(source_code)
+    kinds, starts, ends, lines = store.kinds, store.starts, store.ends, store.lines
+    value_kind = kind_values.get
+    position = 0
+    line_number = 1
+
+    for match in token_regex.finditer(source_code):
+        if match.start() != position:
+            raise LexerError(position)
+
+        token_type = match.lastgroup
+        end = match.end()
+        if token_type == 'WHITESPACE':
+            line_number += source_code.count('\n', position, end)
+        elif token_type != 'COMMENT':
+            kinds.append(value_kind(match.group(), type_kinds[token_type]))
+            starts.append(position)
+            ends.append(end)
+            lines.append(line_number)
+        position = end
+
+    if position < len(source_code):
+        raise LexerError(position)
+
+    return store
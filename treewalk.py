@@ -0,0 +1,58 @@
+# === RECORRIDOS DEL AST ===
+# Recorridos compartidos por los motores de ejecución y las pasadas sobre el AST
+# de `parser`. Usan pilas explícitas en lugar de recursión, así que admiten
+# expresiones y bloques if anidados a cualquier profundidad.
+
+
+def postorder(node, stop=None):
+    """
+    Genera los nodos de una expresión en postorden: cada operación después de
+    sus dos operandos. Las operaciones para las que `stop(nodo)` es verdadero
+    se generan sin recorrer sus operandos.
+    """
+    stack = [(node, False)]
+    while stack:
+        current, ready = stack.pop()
+        if ready or not isinstance(current, tuple) or (stop is not None and stop(current)):
+            yield current
+        else:
+            stack.extend(((current, True), (current[2], False), (current[1], False)))
+
+
+class Blocks:
+    """
+    Recorre en orden las sentencias de un programa. Al iterar genera pares
+    (sentencia, estado del bloque); `enter` abre el cuerpo de un if, cuyas
+    sentencias se generan a continuación con su propio estado.
+    """
+
+    __slots__ = ('stack',)
+
+    def __init__(self, statements, state=None):
+        # Pila de (iterador del bloque, estado, acción al cerrarlo)
+        self.stack = [(iter(statements), state, None)]
+
+    def enter(self, statements, state=None, close=None):
+        """
+        Abre un bloque anidado; `close()` se llama al terminar de recorrerlo.
+        """
+        self.stack.append((iter(statements), state, close))
+
+    @property
+    def depth(self):
+        """
+        Profundidad del bloque actual (0 en el nivel superior).
+        """
+        return len(self.stack) - 1
+
+    def __iter__(self):
+        stack = self.stack
+        while stack:
+            statements, state, close = stack[-1]
+            statement = next(statements, None)
+            if statement is None:
+                stack.pop()
+                if close is not None:
+                    close()
+                continue
+            yield statement, state
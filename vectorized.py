@@ -0,0 +1,222 @@
+import numpy as np
+
+from evaluator import INTERNAL_PREFIX, evaluate
+from treewalk import Blocks, postorder
+
+# === EVALUACIÓN POR LOTES CON NUMPY ===
+# Ejecuta un programa sobre muchas filas de entrada a la vez: cada variable es un
+# arreglo con un valor por fila y las operaciones se aplican elemento a elemento.
+# Un if no salta código: calcula una máscara con las filas donde la condición se
+# cumple y su cuerpo solo modifica esas filas (np.where).
+#
+# La semántica es la de `evaluator.evaluate` aplicada a cada fila. Como una
+# variable puede ser int en unas filas y float en otras, cada valor se lleva
+# como un par (datos, es_entero), donde es_entero es un bool o un arreglo de
+# bool por fila; con tipos mezclados los datos se guardan como float64.
+# Diferencias propias de NumPy:
+# - Los enteros son de 64 bits (pueden desbordarse) y los decimales float64.
+# - Los errores (división entre cero, variable sin valor) se lanzan para todo
+#   el lote si ocurren en alguna fila activa.
+# - Una variable que solo tiene valor en algunas filas se devuelve como arreglo
+#   enmascarado (np.ma) que oculta las demás.
+
+
+def _normalize(data, is_int):
+    """
+    Simplifica el par (datos, es_entero): si todas las filas son del mismo tipo,
+    es_entero pasa a ser un bool y los datos toman el tipo correspondiente.
+    """
+    is_int = np.asarray(is_int)
+    if is_int.ndim == 0 or is_int.all() or not is_int.any():
+        is_int = bool(is_int.all())
+    data = np.asarray(data)
+    if is_int is True and data.dtype.kind == 'f':
+        data = data.astype(np.int64)
+    elif is_int is False and data.dtype.kind in 'iub':
+        data = data.astype(np.float64)
+    return data, is_int
+
+
+def _divide(left, right, mask):
+    """
+    División con truncamiento hacia cero en las filas donde ambos son int
+    y división real en las demás.
+    """
+    (left_data, left_int), (right_data, right_int) = left, right
+    if np.any((right_data == 0) & mask):
+        raise ZeroDivisionError("División entre cero")
+
+    both = np.logical_and(left_int, right_int)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if both is True or (np.ndim(both) == 0 and both):
+            safe = np.where(right_data == 0, 1, right_data)
+            quotient = np.abs(left_data) // np.abs(safe)
+            return np.where((left_data < 0) != (safe < 0), -quotient, quotient), True
+        real = np.true_divide(left_data, right_data)
+        if not np.any(both):
+            return real, False
+        return np.where(both, np.trunc(real), real), both
+
+
+_ARITHMETIC = {'+': np.add, '-': np.subtract, '*': np.multiply}
+
+
+def _binary(op, left, right, mask):
+    """
+    Aplica un operador binario a dos pares (datos, es_entero).
+    """
+    if op in _ARITHMETIC:
+        return _normalize(_ARITHMETIC[op](left[0], right[0]), np.logical_and(left[1], right[1]))
+    if op == '/':
+        return _normalize(*_divide(left, right, mask))
+    if op == '==':
+        return np.equal(left[0], right[0]).astype(np.int64), True
+    raise ValueError(f"Operador desconocido: {op}")
+
+
+class _State:
+    """
+    Variables del lote: valores, tipo por fila, filas donde tienen valor y
+    tipo declarado por fila.
+    """
+
+    def __init__(self, arrays, size):
+        self.size = size
+        self.values = {}
+        self.is_int = {}
+        for name, array in arrays.items():
+            self.values[name], self.is_int[name] = _normalize(array, np.asarray(array).dtype.kind in 'iub')
+        self.defined = {name: np.ones(size, dtype=bool) for name in arrays}
+        self.int_rows = {}      # Filas donde la variable fue declarada int
+        self.float_rows = {}    # Filas donde la variable fue declarada float
+
+    def read(self, name, mask):
+        defined = self.defined.get(name)
+        if defined is None or np.any(mask & ~defined):
+            raise NameError(f"Variable sin valor: {name}")
+        return self.values[name], self.is_int[name]
+
+    def write(self, name, value, mask, full):
+        """
+        Guarda el par `value` en las filas de `mask` (en todas si `full`).
+        """
+        data, is_int = value
+        data = np.broadcast_to(np.asarray(data), (self.size,))
+        if full:
+            self.values[name], self.is_int[name] = data.copy(), is_int
+            self.defined[name] = np.ones(self.size, dtype=bool)
+            return
+
+        if name not in self.values:
+            self.values[name] = np.zeros(self.size, dtype=data.dtype)
+            self.is_int[name] = is_int
+            self.defined[name] = np.zeros(self.size, dtype=bool)
+        self.values[name], self.is_int[name] = _normalize(
+            np.where(mask, data, self.values[name]),
+            np.where(mask, is_int, self.is_int[name]),
+        )
+        self.defined[name] = self.defined[name] | mask
+
+    def convert(self, name, value):
+        """
+        Aplica a cada fila la conversión del tipo declarado de la variable.
+        """
+        data, is_int = value
+        int_rows = self.int_rows.get(name)
+        if int_rows is not None and np.any(int_rows):
+            data = np.where(int_rows, np.trunc(data), data)
+            is_int = np.logical_or(is_int, int_rows)
+        float_rows = self.float_rows.get(name)
+        if float_rows is not None and np.any(float_rows):
+            is_int = np.logical_and(is_int, ~float_rows)
+        return _normalize(data, is_int)
+
+
+def evaluate_batch(ast, arrays, size=None):
+    """
+    Ejecuta el programa sobre todas las filas de `arrays` ({variable: arreglo}).
+    Devuelve el diccionario final {variable: arreglo}.
+    """
+    if size is None:
+        sizes = {len(array) for array in arrays.values()}
+        if len(sizes) != 1:
+            raise ValueError("Todas las entradas deben tener la misma longitud.")
+        size = sizes.pop()
+
+    state = _State(arrays, size)
+    everything = np.ones(size, dtype=bool)
+
+    # El estado de cada bloque es la máscara de sus filas activas
+    blocks = Blocks(ast, everything)
+    for statement, mask in blocks:
+        full = mask is everything
+        kind = statement[0]
+        if kind == 'DECLARATION':
+            _, type_name, name = statement[:3]
+            data = evaluate_expression(statement[3], state, mask)[0] if len(statement) > 3 else 0
+            is_int = type_name == 'int'
+            value = _normalize(np.trunc(data) if is_int else data, is_int)
+            state.write(name, value, mask, full)
+            for rows, flag in ((state.int_rows, is_int), (state.float_rows, not is_int)):
+                previous = rows.get(name, np.zeros(size, dtype=bool))
+                rows[name] = np.where(mask, flag, previous)
+
+        elif kind == 'ASSIGNMENT':
+            _, name, expr = statement
+            value = state.convert(name, evaluate_expression(expr, state, mask))
+            state.write(name, value, mask, full)
+
+        elif kind == 'IF':
+            condition = evaluate_expression(statement[1], state, mask)[0] != 0
+            blocks.enter(statement[2], mask & np.broadcast_to(condition, (size,)))
+
+        else:
+            raise ValueError(f"Sentencia desconocida: {kind}")
+
+    result = {}
+    for name, value in state.values.items():
+        if name.startswith(INTERNAL_PREFIX):
+            continue
+        defined = state.defined[name]
+        result[name] = value if defined.all() else np.ma.array(value, mask=~defined)
+    return result
+
+
+def evaluate_expression(node, state, mask):
+    """
+    Calcula una expresión para todas las filas y devuelve el par (datos, es_entero).
+    """
+    results = []
+    for current in postorder(node):
+        if not isinstance(current, tuple):
+            if isinstance(current, str):
+                results.append(state.read(current, mask))
+            else:
+                results.append((current, isinstance(current, int)))
+            continue
+
+        right, left = results.pop(), results.pop()
+        results.append(_binary(current[0], left, right, mask))
+
+    return results[-1]
+
+
+def check_rows(ast, arrays, rows=None):
+    """
+    Compara, fila por fila, el resultado por lotes con `evaluator.evaluate`.
+    Revisa las `rows` primeras filas (todas si es None) y devuelve cuántas revisó.
+    """
+    batch = evaluate_batch(ast, arrays)
+    size = len(next(iter(batch.values()))) if batch else 0
+    rows = size if rows is None else min(rows, size)
+
+    for row in range(rows):
+        inputs = {name: np.asarray(array)[row].item() for name, array in arrays.items()}
+        expected = evaluate(ast, inputs)
+        for name, values in batch.items():
+            masked = np.ma.is_masked(values) and values.mask[row]
+            if masked != (name not in expected):
+                raise AssertionError(f"Fila {row}: '{name}' difiere en si tiene valor")
+            if not masked and values[row] != expected[name]:
+                raise AssertionError(f"Fila {row}: {name} = {values[row]} en lote, {expected[name]} esperado")
+    return rows
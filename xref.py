@@ -0,0 +1,274 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import LexerError
+from paths import expand_paths
+from positions import parse_with_spans
+
+# === ÍNDICE DE REFERENCIAS CRUZADAS ===
+# Índice invertido identificador -> (archivo, línea, rol) para todo un corpus,
+# guardado en una base SQLite. Responde "¿qué archivos y líneas asignan o leen
+# la variable x?" sin volver a analizar nada.
+#
+# Roles: 'declare' (destino de una declaración), 'assign' (destino de una
+# asignación) y 'read' (variable dentro de una expresión o condición de if).
+# La línea de una lectura es la de su token (con `positions.Spans`); la de un
+# destino es la de su sentencia.
+#
+# El índice se actualiza por archivo: si no cambiaron el tamaño ni la fecha de
+# modificación, el archivo no se lee; si cambiaron pero el contenido (su hash)
+# es el mismo, no se vuelve a analizar. Los nombres se guardan una sola vez y
+# las referencias son filas de enteros en una tabla sin rowid.
+#
+# Uso:
+#   python xref.py index indice.db archivo|directorio|patrón ... [-j N] [--prune]
+#   python xref.py query indice.db nombre [--role read|assign|declare]
+
+ROLES = ('declare', 'assign', 'read')
+_ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS names (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    name_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    role INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (name_id, file_id, line, role)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS refs_by_file ON refs (file_id);
+"""
+
+
+def collect_references(source_code):
+    """
+    Analiza un texto y devuelve {(nombre, línea, rol): veces}.
+    """
+    ast, spans = parse_with_spans(source_code)
+    index = spans.index
+    references = {}
+
+    def add(name, line, role):
+        key = (name, line, role)
+        references[key] = references.get(key, 0) + 1
+
+    for number, node in enumerate(spans.nodes):
+        if isinstance(node, str):
+            add(node, index.line(spans.starts[number]), 'read')
+        elif isinstance(node, tuple) and node[0] in ('DECLARATION', 'ASSIGNMENT'):
+            line = index.line(spans.starts[number])
+            if node[0] == 'DECLARATION':
+                add(node[2], line, 'declare')
+            else:
+                add(node[1], line, 'assign')
+    return references
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def scan_file(path, known=None):
+    """
+    Lee y analiza un archivo. `known` es (tamaño, fecha, hash) guardados en el
+    índice. Devuelve un diccionario con 'status': 'unchanged' (no se leyó),
+    'touched' (cambió la fecha pero no el contenido) o 'parsed'.
+    """
+    try:
+        stat = os.stat(path)
+        if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return {'path': path, 'status': 'unchanged'}
+        with open(path, 'rb') as file:
+            data = file.read()
+    except OSError as error:
+        return {'path': path, 'status': 'missing', 'error': str(error)}
+
+    result = {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+              'digest': _digest(data), 'references': {}, 'error': None}
+    if known is not None and known[2] == result['digest']:
+        result['status'] = 'touched'
+        return result
+
+    result['status'] = 'parsed'
+    try:
+        result['references'] = collect_references(data.decode('utf-8'))
+    except (LexerError, SyntaxError, UnicodeDecodeError) as error:
+        result['error'] = str(error)
+    return result
+
+
+def _scan(item):
+    return scan_file(*item)
+
+
+class XrefIndex:
+    """
+    Índice de referencias cruzadas en una base SQLite.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+        self._names = None
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def _name_id(self, name):
+        if self._names is None:
+            self._names = dict(self.connection.execute("SELECT name, id FROM names"))
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self.connection.execute("INSERT INTO names (name) VALUES (?)", (name,)).lastrowid
+            self._names[name] = name_id
+        return name_id
+
+    def update(self, paths, pattern='*', workers=1, chunksize=16, prune=False):
+        """
+        Pone al día el índice con los archivos de `paths` (ver
+        `paths.expand_paths`). Con `prune`, elimina del índice los
+        archivos que ya no están entre ellos. Devuelve contadores por estado.
+        """
+        known = {path: (file_id, size, mtime_ns, digest) for file_id, path, size, mtime_ns, digest in
+                 self.connection.execute("SELECT id, path, size, mtime_ns, digest FROM files")}
+        items = [(path, known[path][1:] if path in known else None)
+                 for path in (os.path.abspath(path) for path in expand_paths(paths, pattern))]
+        counts = {'unchanged': 0, 'touched': 0, 'parsed': 0, 'missing': 0, 'removed': 0, 'errors': 0}
+
+        if workers == 1:
+            results = map(_scan, items)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(_scan, items, chunksize=chunksize)
+        try:
+            with self.connection:
+                for result in results:
+                    counts[result['status']] += 1
+                    if result['status'] in ('unchanged', 'missing'):
+                        continue
+                    self._store(result, known.get(result['path'], (None,))[0])
+                    counts['errors'] += result['error'] is not None
+                if prune:
+                    seen = {path for path, _ in items}
+                    for path, (file_id, *_) in known.items():
+                        if path not in seen:
+                            self._remove(file_id)
+                            counts['removed'] += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return counts
+
+    def _store(self, result, file_id):
+        execute = self.connection.execute
+        if file_id is None:
+            file_id = execute(
+                "INSERT INTO files (path, size, mtime_ns, digest, error) VALUES (?, ?, ?, ?, ?)",
+                (result['path'], result['size'], result['mtime_ns'], result['digest'], result['error']),
+            ).lastrowid
+        else:
+            execute("UPDATE files SET size = ?, mtime_ns = ?, digest = ?, error = ? WHERE id = ?",
+                    (result['size'], result['mtime_ns'], result['digest'], result['error'], file_id))
+            if result['status'] == 'touched':
+                return
+            execute("DELETE FROM refs WHERE file_id = ?", (file_id,))
+
+        self.connection.executemany(
+            "INSERT INTO refs (name_id, file_id, line, role, count) VALUES (?, ?, ?, ?, ?)",
+            [(self._name_id(name), file_id, line, _ROLE_CODES[role], count)
+             for (name, line, role), count in result['references'].items()],
+        )
+
+    def _remove(self, file_id):
+        self.connection.execute("DELETE FROM refs WHERE file_id = ?", (file_id,))
+        self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def query(self, name, role=None):
+        """
+        Devuelve la lista de (archivo, línea, rol, veces) de un identificador,
+        ordenada por archivo y línea.
+        """
+        sql = ("SELECT files.path, refs.line, refs.role, refs.count FROM refs "
+               "JOIN names ON names.id = refs.name_id JOIN files ON files.id = refs.file_id "
+               "WHERE names.name = ?")
+        parameters = [name]
+        if role is not None:
+            sql += " AND refs.role = ?"
+            parameters.append(_ROLE_CODES[role])
+        sql += " ORDER BY files.path, refs.line, refs.role"
+        return [(path, line, ROLES[code], count)
+                for path, line, code, count in self.connection.execute(sql, parameters)]
+
+    def stats(self):
+        execute = self.connection.execute
+        return {
+            'files': execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            'failed_files': execute("SELECT COUNT(*) FROM files WHERE error IS NOT NULL").fetchone()[0],
+            'names': execute("SELECT COUNT(*) FROM names").fetchone()[0],
+            'references': execute("SELECT COUNT(*) FROM refs").fetchone()[0],
+            'bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(prog='xref', description='Índice de referencias cruzadas.')
+    commands = arguments.add_subparsers(dest='command', required=True)
+    index = commands.add_parser('index', help='crea o actualiza el índice')
+    index.add_argument('database', help='archivo de la base de datos')
+    index.add_argument('paths', nargs='+', help='archivos, directorios o patrones glob')
+    index.add_argument('-j', '--workers', type=int, default=None,
+                       help='número de procesos (por defecto, uno por CPU)')
+    index.add_argument('--pattern', default='*', help='patrón de nombre para los archivos de los directorios')
+    index.add_argument('--prune', action='store_true', help='elimina los archivos que ya no se indicaron')
+    query = commands.add_parser('query', help='busca un identificador')
+    query.add_argument('database', help='archivo de la base de datos')
+    query.add_argument('name', help='identificador')
+    query.add_argument('--role', choices=ROLES, help='solo este rol')
+    options = arguments.parse_args(argv)
+
+    start = time.perf_counter()
+    with XrefIndex(options.database) as xref:
+        if options.command == 'index':
+            counts = xref.update(options.paths, options.pattern, options.workers, prune=options.prune)
+            stats = xref.stats()
+            print(', '.join(f"{count} {status}" for status, count in counts.items())
+                  + f" en {time.perf_counter() - start:.2f} s", file=sys.stderr)
+            print(f"{stats['files']} archivos, {stats['names']} nombres, {stats['references']} referencias, "
+                  f"{stats['bytes']:,} bytes", file=sys.stderr)
+            return 0
+
+        results = xref.query(options.name, options.role)
+        for path, line, role, count in results:
+            print(f"{path}:{line}: {role}" + (f" (x{count})" if count > 1 else ""))
+        print(f"{len(results)} referencias en {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+        return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())